@@ -0,0 +1,11 @@
+"""Load backend/.env for the standalone scripts in this package.
+
+Import this before other ``app.llm`` modules: some of them read their settings
+(concurrency limits, debug flags) from the environment at import time. Python
+only runs a module once, so the file is loaded once however many scripts import it.
+"""
+import os
+from dotenv import load_dotenv
+
+ENV_PATH = os.path.abspath(os.path.join(os.path.dirname(__file__), "..", "..", ".env"))
+load_dotenv(dotenv_path=ENV_PATH)
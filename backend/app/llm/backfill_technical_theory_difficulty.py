@@ -1,5 +1,24 @@
+import mmap
 import os
-import json
+import re
+import sys
+
+try:
+    import orjson
+
+    def _loads(data: bytes):
+        return orjson.loads(data)
+
+    def _dumps(data) -> bytes:
+        return orjson.dumps(data, option=orjson.OPT_INDENT_2 | orjson.OPT_NON_STR_KEYS)
+except ImportError:
+    import json
+
+    def _loads(data: bytes):
+        return json.loads(data)
+
+    def _dumps(data) -> bytes:
+        return json.dumps(data, indent=2, ensure_ascii=False).encode("utf-8")
 
 
 SCRIPT_DIR = os.path.dirname(os.path.abspath(__file__))
@@ -15,22 +34,59 @@ LEVEL_DEFAULT_DIFFICULTY = {
     "lead": 90,
 }
 
+# Quotes inside JSON strings are escaped, so these only match object keys
+_QUESTION_KEY_RE = re.compile(rb'"question"\s*:')
+_DIFFICULTY_KEY_RE = re.compile(rb'"difficulty"\s*:')
+
+
+def _needs_backfill(buf) -> bool:
+    """Cheap byte scan: True unless every question key is paired with a difficulty key.
 
-def main() -> None:
-    if not os.path.exists(TECH_THEORY_PATH):
-        print(f"No technical_theory.json found at {TECH_THEORY_PATH}")
-        return
+    Each question's object is bounded by the nearest braces around its key. Braces in
+    string values can only narrow that span, so a difficulty key found in it belongs
+    to the same (flat) question object; a narrowed span just falls back to a parse.
+    """
+    for match in _QUESTION_KEY_RE.finditer(buf):
+        start = buf.rfind(b"{", 0, match.start())
+        end = buf.find(b"}", match.end())
+        if start < 0 or end < 0 or _DIFFICULTY_KEY_RE.search(buf, start, end) is None:
+            return True
+    return False
+
+
+def backfill_file(path: str) -> int:
+    """Backfill missing difficulty values in one technical theory JSON file.
+
+    The file is memory-mapped and scanned for question keys without a matching
+    difficulty first, so an already complete file is never parsed. Otherwise it
+    is read and written back with a single call each. Returns the number of
+    questions that were updated.
+    """
+    name = os.path.basename(path)
+    try:
+        with open(path, "rb") as f:
+            try:
+                with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+                    if not _needs_backfill(mm):
+                        print(f"No questions were missing difficulty in {name}; nothing changed.")
+                        return 0
+                    raw = mm[:]
+            except ValueError:
+                # Empty files cannot be mapped; let the parser report them
+                raw = f.read()
+    except FileNotFoundError:
+        print(f"No {name} found at {path}")
+        return 0
 
     try:
-        with open(TECH_THEORY_PATH, "r", encoding="utf-8") as f:
-            data = json.load(f)
+        data = _loads(raw)
     except Exception as e:
-        print(f"Failed to load technical_theory.json: {e}")
-        return
+        print(f"Failed to load {name}: {e}")
+        return 0
 
     if not isinstance(data, dict):
-        print("Unexpected JSON structure: expected top-level object (dict).")
-        return
+        print(f"Unexpected JSON structure in {name}: expected top-level object (dict).")
+        return 0
 
     updated = 0
 
@@ -61,16 +117,26 @@ def main() -> None:
                 updated += 1
 
     if updated == 0:
-        print("No questions were missing difficulty; nothing changed.")
-        return
+        print(f"No questions were missing difficulty in {name}; nothing changed.")
+        return 0
 
-    with open(TECH_THEORY_PATH, "w", encoding="utf-8") as f:
-        json.dump(data, f, indent=2, ensure_ascii=False)
+    # Serialize up front and swap the file in atomically, so an interrupted
+    # run can never leave a truncated question bank behind.
+    payload = _dumps(data)
+    tmp_path = path + ".tmp"
+    with open(tmp_path, "wb") as f:
+        f.write(payload)
+    os.replace(tmp_path, path)
 
-    print(f"Backfilled difficulty for {updated} questions in technical_theory.json.")
+    print(f"Backfilled difficulty for {updated} questions in {name}.")
+    return updated
 
 
-if __name__ == "__main__":
-    main()
+def main(paths=None) -> None:
+    """Backfill each given JSON shard, defaulting to technical_theory.json."""
+    for path in paths or [TECH_THEORY_PATH]:
+        backfill_file(path)
 
 
+if __name__ == "__main__":
+    main(sys.argv[1:])
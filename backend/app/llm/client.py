@@ -1,20 +1,31 @@
-from pydantic import BaseModel
+from typing import Optional
+from pydantic import BaseModel, ConfigDict
 
 class LLMTextRequest(BaseModel):
+    model_config = ConfigDict(frozen=True)
+
     prompt: str
-    system: str = None
-    temperature: float = None
-    max_tokens: int = None
-    metadata: dict = None
+    system: Optional[str] = None
+    temperature: Optional[float] = None
+    max_tokens: Optional[int] = None
+    metadata: Optional[dict] = None
+    # Passed through as OpenAI's response_format, e.g. {"type": "json_object"}
+    response_format: Optional[dict] = None
+    # Receive the completion as server-sent events; see OpenAIClient.generate_text_stream
+    stream: bool = False
 
 class LLMUsage(BaseModel):
-    prompt_tokens: int = None
-    completion_tokens: int = None
-    total_tokens: int = None
+    model_config = ConfigDict(frozen=True)
+
+    prompt_tokens: Optional[int] = None
+    completion_tokens: Optional[int] = None
+    total_tokens: Optional[int] = None
 
 class LLMTextResponse(BaseModel):
+    model_config = ConfigDict(frozen=True)
+
     text: str
-    usage: LLMUsage = None
-    raw: dict = None
+    usage: Optional[LLMUsage] = None
+    raw: Optional[dict] = None
 
 
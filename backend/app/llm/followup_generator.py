@@ -3,15 +3,15 @@ LLM-based follow-up question generator for behavioural interviews
 """
 import os
 from .client import LLMTextRequest
-from .openai import OpenAIClient
+from .openai import OpenAIClient, get_openai_client
 from .prompts.renderer import render as render_prompt
 
 
 class FollowUpQuestionGenerator:
     """Generates follow-up questions based on candidate answers"""
     
-    def __init__(self, openai_client: OpenAIClient):
-        self.client = openai_client
+    def __init__(self, openai_client: OpenAIClient = None):
+        self.client = openai_client or get_openai_client()
     
     async def generate_followup(
         self,
@@ -50,10 +50,12 @@ class FollowUpQuestionGenerator:
         
         # Clean up the response - remove any extra formatting
         followup_question = llm_resp.text.strip()
-        # Remove quotes if the LLM wrapped it
-        if followup_question.startswith('"') and followup_question.endswith('"'):
-            followup_question = followup_question[1:-1]
-        if followup_question.startswith("'") and followup_question.endswith("'"):
-            followup_question = followup_question[1:-1]
+        # Remove quotes if the LLM wrapped it (re-strip only when a pair was removed)
+        while (
+            len(followup_question) >= 2
+            and followup_question[0] == followup_question[-1]
+            and followup_question[0] in "\"'"
+        ):
+            followup_question = followup_question[1:-1].strip()
         
-        return followup_question.strip()
+        return followup_question
@@ -1,121 +1,307 @@
+import asyncio
+import hashlib
 import json
+import logging
+import os
 import re
-import sys
+import time
+from collections import OrderedDict
+from functools import lru_cache
+
+try:
+    from orjson import loads as _loads
+except ImportError:
+    from json import loads as _loads
+from pydantic import ValidationError
 from .schemas import BehaviouralJudgeResult, TheoreticalJudgeResult, IDEJudgeResult, TextJudgeResult
 from .client import LLMTextRequest
-from .prompts.renderer import render as render_prompt
+from .openai import get_openai_client
+from .prompts.renderer import get_template, render as render_prompt
 from .video_processor import VideoProcessor
 
+logger = logging.getLogger(__name__)
+
+# LLM_JUDGE_DEBUG=1 keeps the old llm_judge_debug.log trail of raw LLM output;
+# otherwise the debug calls below are a level check and nothing more.
+if os.environ.get("LLM_JUDGE_DEBUG") == "1":
+    logger.addHandler(logging.FileHandler("llm_judge_debug.log", encoding="utf-8"))
+    logger.setLevel(logging.DEBUG)
+
+# raw_decode scans in C, honours string literals and stops at the matching brace
+_DECODER = json.JSONDecoder()
+
+# System prompts take no context, so render them once at import
+_BEHAVIOURAL_SYSTEM = render_prompt("role/behavioural/judge/system_prompt.jinja")
+_PRACTICAL_SYSTEM = render_prompt("role/technical_practical/judge/system_prompt.jinja")
+# User prompts vary per call; keep the compiled templates so each call only renders
+_BEHAVIOURAL_USER_TPL = get_template("role/behavioural/judge/user_prompt.jinja")
+_PRACTICAL_USER_TPL = get_template("role/technical_practical/judge/user_prompt.jinja")
+_PRACTICAL_BATCH_TPL = get_template("role/technical_practical/judge/user_prompt_batch.jinja")
+
+# JSON mode makes the API return a bare JSON object, so single-answer judge replies
+# take the model_validate_json fast path instead of the clean-up fallbacks
+_JSON_OBJECT = {"type": "json_object"}
+
+# Shared cap on in-flight judge completions so gathered judging can't burst past the rate limit
+_JUDGE_SEM = asyncio.Semaphore(int(os.environ.get("LLM_JUDGE_CONCURRENCY", "16")))
+
+# Judge results keyed by a digest of the exact prompts sent, so resubmissions and
+# retries of an identical answer are served without another LLM call
+_RESULT_CACHE_SIZE = 4096
+_RESULT_TTL_S = 3600
+_result_cache = OrderedDict()
+_inflight = {}
+
+# Practical submissions packed into a single LLM call by PracticalJudge.judge_batch
+_BATCH_SIZE = 5
+
+# Tone prefixes for the overall practical reasoning (see _build_overall_reasoning)
+_PREFIX_HIRE = "You absolutely crushed this practical round. "
+_PREFIX_OK = "You did okay overall in this practical round. "
+_PREFIX_ROUGH = "This practical round was rough for you. "
+
+# Language hints for submitted code, collected in one scan (see _detect_language)
+_LANG_MARKER_RE = re.compile(r"//|function|const|let|def |import |print\(|=>")
+_COMMENT, _FUNCTION, _CONST_LET, _PYTHON, _ARROW = 1, 2, 4, 8, 16
+_LANG_MARKER_BITS = {
+    "//": _COMMENT,
+    "function": _FUNCTION,
+    "const": _CONST_LET,
+    "let": _CONST_LET,
+    "def ": _PYTHON,
+    "import ": _PYTHON,
+    "print(": _PYTHON,
+    "=>": _ARROW,
+}
+_ALL_MARKERS = _COMMENT | _FUNCTION | _CONST_LET | _PYTHON | _ARROW
+# A "// filename" or "// File: name.ext" line separating files in a multi-file submission
+_FILE_MARKER_RE = re.compile(
+    r"^\s*//.*?(?:file|\.(?:js|py|ts|java|cpp|c|go|rs|html|css))", re.IGNORECASE | re.MULTILINE
+)
+
+
+def _strip_code_fences(text: str) -> str:
+    """Strip surrounding whitespace and markdown code fences from an LLM response."""
+    cleaned = text.strip()
+    if cleaned.startswith("```"):
+        # Fences are literal, so plain slicing does the job without the regex engine
+        cleaned = cleaned[3:]
+        if cleaned[:4].lower() == "json":
+            cleaned = cleaned[4:]
+        cleaned = cleaned.strip()
+        if cleaned.endswith("```"):
+            cleaned = cleaned[:-3].rstrip()
+    return cleaned
+
+
+def _parse_llm_json(text: str) -> dict:
+    """Attempt to extract a JSON object from an LLM response with aggressive clean-up.
+
+    Shared by every judge so they all behave consistently.
+    """
+    cleaned = text.strip()
+    if cleaned.startswith("{"):
+        # Usual case: a bare JSON object with no fences or prose around it
+        try:
+            return _loads(cleaned)
+        except ValueError:
+            pass
+    else:
+        cleaned = _strip_code_fences(cleaned)
+        # Quick parse attempt
+        try:
+            result = _loads(cleaned)
+            if isinstance(result, dict):
+                return result
+            if isinstance(result, list) and result and isinstance(result[0], dict):
+                return result[0]
+        except Exception:
+            pass
+    # Formatting is deferred, so this costs one level check unless DEBUG is on
+    logger.debug("\n--- LLM Output ---\n%s", cleaned)
+    # Decode the first JSON value that starts at a "{", skipping stray braces in prose
+    start = cleaned.find("{")
+    while start >= 0:
+        try:
+            result2, _ = _DECODER.raw_decode(cleaned, start)
+            return result2
+        except ValueError:
+            start = cleaned.find("{", start + 1)
+    logger.debug("Could not parse LLM output with any strategy.")
+    raise ValueError(f"Failed to parse JSON from LLM response after multiple strategies.\nRaw output was:\n{text}")
+
+
+def _parse_llm_json_array(text: str) -> list:
+    """Extract the JSON array a batched judge prompt asks for."""
+    cleaned = _strip_code_fences(text)
+    logger.debug("\n--- LLM Output ---\n%s", cleaned)
+    try:
+        result = _loads(cleaned)
+        if isinstance(result, list):
+            return result
+    except Exception:
+        pass
+    start = cleaned.find("[")
+    while start >= 0:
+        try:
+            result2, _ = _DECODER.raw_decode(cleaned, start)
+            if isinstance(result2, list):
+                return result2
+        except ValueError:
+            pass
+        start = cleaned.find("[", start + 1)
+    raise ValueError(f"Failed to parse a JSON array from LLM response.\nRaw output was:\n{text}")
+
+
+def _detect_language(code: str):
+    """Guess the language of a submission from a single scan over its marker tokens."""
+    seen = 0
+    for match in _LANG_MARKER_RE.finditer(code):
+        seen |= _LANG_MARKER_BITS[match.group()]
+        # JavaScript wins over everything else, so stop as soon as it is certain
+        if seen & _COMMENT and seen & (_FUNCTION | _CONST_LET) or seen == _ALL_MARKERS:
+            break
+    if seen & _COMMENT and seen & (_FUNCTION | _CONST_LET):
+        return 'javascript'
+    if seen & _PYTHON:
+        return 'python'
+    if seen & _FUNCTION and seen & _ARROW and '{' in code:
+        return 'typescript'
+    return None
+
+
+def _nth_line_end(text: str, n: int) -> int:
+    """Index just past the first ``n`` lines of ``text`` (``len(text)`` if it is shorter)."""
+    end = -1
+    for _ in range(n):
+        end = text.find("\n", end + 1)
+        if end < 0:
+            return len(text)
+    return end
+
+
+def _cache_key(*parts: str) -> bytes:
+    return hashlib.blake2b("\x1f".join(parts).encode(), digest_size=16).digest()
+
+
+def _store_result(key: bytes, task: asyncio.Future) -> None:
+    _inflight.pop(key, None)
+    if task.cancelled() or task.exception() is not None:
+        return
+    _result_cache[key] = (time.monotonic() + _RESULT_TTL_S, task.result())
+    if len(_result_cache) > _RESULT_CACHE_SIZE:
+        _result_cache.popitem(last=False)
+
+
+async def _single_flight(key: bytes, compute):
+    """Return the cached result for ``key``, or await ``compute()`` to produce it.
+
+    Concurrent callers with the same key share one in-flight call, and only
+    successful results are cached.
+    """
+    hit = _result_cache.get(key)
+    if hit is not None:
+        expires_at, result = hit
+        if expires_at > time.monotonic():
+            _result_cache.move_to_end(key)
+            return result
+        del _result_cache[key]
+    task = _inflight.get(key)
+    if task is None:
+        task = asyncio.ensure_future(compute())
+        _inflight[key] = task
+        task.add_done_callback(lambda done: _store_result(key, done))
+    # One caller being cancelled must not cancel the call the others are waiting on
+    return await asyncio.shield(task)
+
+
+def _validate_llm_json(model, text: str):
+    """Validate an LLM response against ``model``.
+
+    Clean JSON is parsed and validated by pydantic in a single pass; anything
+    else goes through ``_parse_llm_json`` to dig the object out first.
+    """
+    try:
+        return model.model_validate_json(_strip_code_fences(text))
+    except ValidationError:
+        return model.model_validate(_parse_llm_json(text))
+
+
 class BehaviouralJudge:
-    def __init__(self, openai_client):
-        self.client = openai_client
-        self.video_processor = VideoProcessor(openai_client)
+    def __init__(self, openai_client=None):
+        self.client = openai_client or get_openai_client()
+        self.video_processor = VideoProcessor(self.client)
 
     async def judge(self, question: str, answer: str) -> BehaviouralJudgeResult:
-        # Check if answer is video data and transcribe if needed
-        if self.video_processor.is_video_data(answer):
-            answer = await self.video_processor.transcribe_video(answer)
+        # Transcribe video answers; transcribe_video does the data-URI check itself
+        # and hands text answers back unchanged, so the answer is only probed once
+        answer = await self.video_processor.transcribe_video(answer)
+        logger.debug("Behavioural judge: question=%.200s answer=%.200s", question, answer)
         
-        system = render_prompt("role/behavioural/judge/system_prompt.jinja")
-        prompt = render_prompt(
-            "role/behavioural/judge/user_prompt.jinja", question=question, answer=answer
-        )
-        llm_resp = await self.client.generate_text(
-            LLMTextRequest(
-                prompt=prompt,
-                system=system,
-                temperature=0.0,
-                max_tokens=700,
+        system = _BEHAVIOURAL_SYSTEM
+        prompt = _BEHAVIOURAL_USER_TPL.render(question=question, answer=answer)
+        return await _single_flight(_cache_key(system, prompt), lambda: self._complete(system, prompt))
+
+    async def _complete(self, system: str, prompt: str) -> BehaviouralJudgeResult:
+        async with _JUDGE_SEM:
+            llm_resp = await self.client.generate_text(
+                LLMTextRequest(
+                    prompt=prompt,
+                    system=system,
+                    temperature=0.0,
+                    max_tokens=700,
+                    response_format=_JSON_OBJECT,
+                )
             )
-        )
         try:
             raw_text = llm_resp.text or ""
-            result_data = self._parse_llm_json(raw_text)
-            return BehaviouralJudgeResult(**result_data)
+            return _validate_llm_json(BehaviouralJudgeResult, raw_text)
         except Exception:
             # Truncate very long responses for readability
             snippet = (llm_resp.text[:500] + "...") if len(llm_resp.text) > 500 else llm_resp.text
             raise ValueError(f"LLM did not produce valid JSON judge output (sanitized attempt failed). Raw snippet: {snippet}")
 
-    def _parse_llm_json(self, text: str) -> dict:
-        """Attempt to extract a JSON object from an LLM response with aggressive clean-up"""
-        cleaned = text.strip()
-        # Remove markdown code fences if present
-        if cleaned.startswith("```"):
-            cleaned = re.sub(r"^```(?:json)?\\s*", "", cleaned, flags=re.IGNORECASE)
-            cleaned = re.sub(r"```$", "", cleaned.strip())
-        # Debug: always print the raw cleaned LLM output in full
-        print("[DEBUG] Raw LLM output:")
-        print(cleaned)
-        sys.stdout.flush()
-        with open("llm_judge_debug.log", "a", encoding="utf-8") as debug_log:
-            debug_log.write("\n--- LLM Output ---\n" + cleaned + "\n")
-        # Quick json.loads attempt
-        try:
-            result = json.loads(cleaned)
-            if isinstance(result, dict):
-                return result
-            if isinstance(result, list) and result and isinstance(result[0], dict):
-                return result[0]
-        except Exception:
-            pass
-        # Regex: find first JSON object
-        match = re.search(r"{[\s\S]*}", cleaned)
-        if match:
-            candidate = match.group(0)
-            last_brace = candidate.rfind("}")
-            candidate = candidate[: last_brace + 1]
-            try:
-                result2 = json.loads(candidate)
-                if isinstance(result2, dict):
-                    return result2
-                if isinstance(result2, list) and result2 and isinstance(result2[0], dict):
-                    return result2[0]
-            except Exception:
-                pass
-        # Line by line brace-block fallback as before
-        lines = [l for l in cleaned.splitlines() if l.strip()]
-        json_lines = []
-        in_obj = False
-        brace_count = 0
-        for line in lines:
-            if not in_obj and "{" in line:
-                in_obj = True
-            if in_obj:
-                json_lines.append(line)
-                brace_count += line.count("{")
-                brace_count -= line.count("}")
-                if brace_count <= 0:
-                    break
-        if json_lines:
-            candidate2 = "\n".join(json_lines).strip()
-            try:
-                result3 = json.loads(candidate2)
-                if isinstance(result3, dict):
-                    return result3
-                if isinstance(result3, list) and result3 and isinstance(result3[0], dict):
-                    return result3[0]
-            except Exception:
-                pass
-        # On failure, print raw for debug
-        print("[DEBUG] Could not parse LLM output with any strategy! - See llm_judge_debug.log for the full text.")
-        raise ValueError(f"Failed to parse JSON from LLM response after multiple strategies.\nRaw output was:\n{text}")
+@lru_cache(maxsize=1024)
+def _normalize_answer(answer: str) -> str:
+    """Normalize a multiple-choice answer for comparison (cached per distinct answer)."""
+    return answer.strip().casefold()
+
 
 class TheoreticalJudge:
     def judge(self, question_data: dict, user_answer: str) -> TheoreticalJudgeResult:
-        correct_answer = question_data.get("correct", "").strip().lower()
-        user_answer_clean = user_answer.strip().lower()
-        is_correct = user_answer_clean == correct_answer
+        # Every player answering a question shares its correct answer, so it is
+        # normalized once and served from the cache afterwards. The normalized
+        # forms are only compared; the result carries the answer as written.
+        correct_answer = question_data.get("correct", "")
+        is_correct = _normalize_answer(user_answer) == _normalize_answer(correct_answer)
         score = 200 if is_correct else 0
-        return TheoreticalJudgeResult(
+        # Every field is computed here, so there is nothing for pydantic to validate
+        return TheoreticalJudgeResult.model_construct(
             score=score,
             is_correct=is_correct,
             correct_answer=correct_answer
         )
 
+    def judge_many(self, questions: list, answers: list) -> list:
+        """Judge a whole quiz at once; ``questions[i]`` is paired with ``answers[i]``.
+
+        Answers are option texts, so both sides come from a small set of strings
+        and are normalized through the shared cache.
+        """
+        results = []
+        for question_data, user_answer in zip(questions, answers):
+            correct_answer = question_data.get("correct", "")
+            is_correct = _normalize_answer(user_answer) == _normalize_answer(correct_answer)
+            results.append(TheoreticalJudgeResult.model_construct(
+                score=200 if is_correct else 0,
+                is_correct=is_correct,
+                correct_answer=correct_answer,
+            ))
+        return results
+
 class PracticalJudge:
-    def __init__(self, openai_client):
-        self.client = openai_client
+    def __init__(self, openai_client=None):
+        self.client = openai_client or get_openai_client()
 
     async def judge_submission(self, question: dict, submission: dict) -> dict:
         results = {}
@@ -123,10 +309,17 @@ class PracticalJudge:
         text_ans = submission.get("text_answer", "")
         both = bool(ide_code) and bool(text_ans)
         score_max = 500 if both else 1000
+        # The IDE and text evaluations are independent LLM calls, so run them concurrently
+        keys = []
+        calls = []
         if ide_code:
-            results["ide"] = await self.judge_ide(question, ide_code, score_max)
+            keys.append("ide")
+            calls.append(self.judge_ide(question, ide_code, score_max))
         if text_ans:
-            results["text"] = await self.judge_text(question, text_ans, score_max)
+            keys.append("text")
+            calls.append(self.judge_text(question, text_ans, score_max))
+        for key, result in zip(keys, await asyncio.gather(*calls)):
+            results[key] = result
         total_score = self._calculate_total_score(results)
         results["total_score"] = total_score
         # Build one overall reasoning string for the whole practical round (0-3000 scale)
@@ -134,6 +327,62 @@ class PracticalJudge:
             results["reasoning"] = self._build_overall_reasoning(results, total_score)
         return results
 
+    async def judge_batch(self, submissions: list) -> list:
+        """
+        Judge many practical answers with one LLM call per ``_BATCH_SIZE`` of them.
+
+        Each submission is a dict with ``question``, ``evaluation_type`` ("ide" or
+        "text"), ``answer`` and ``score_max``. Returns IDEJudgeResult/TextJudgeResult
+        objects in submission order. A batch whose reply can't be matched back to
+        its submissions is re-judged one submission at a time.
+        """
+        chunks = [submissions[i:i + _BATCH_SIZE] for i in range(0, len(submissions), _BATCH_SIZE)]
+        judged = await asyncio.gather(*(self._judge_chunk(chunk) for chunk in chunks))
+        return [result for chunk_results in judged for result in chunk_results]
+
+    async def _judge_chunk(self, chunk: list) -> list:
+        tasks = []
+        for item in chunk:
+            question = item.get("question", "")
+            evaluation_type = item.get("evaluation_type", "text")
+            answer = item.get("answer", "")
+            tasks.append({
+                "question": question.get("question", "") if isinstance(question, dict) else str(question),
+                "evaluation_type": evaluation_type,
+                "answer": self._format_code_for_llm(answer) if evaluation_type == "ide" else answer,
+                "score_max": item.get("score_max", 1000),
+            })
+        try:
+            system = _PRACTICAL_SYSTEM
+            prompt = _PRACTICAL_BATCH_TPL.render(tasks=tasks)
+            async with _JUDGE_SEM:
+                llm_resp = await self.client.generate_text(
+                    LLMTextRequest(
+                        prompt=prompt,
+                        system=system,
+                        temperature=0.0,
+                        max_tokens=700 * len(chunk),
+                    )
+                )
+            items = _parse_llm_json_array(llm_resp.text or "")
+            if len(items) != len(chunk):
+                raise ValueError(f"expected {len(chunk)} results, got {len(items)}")
+            return [
+                (IDEJudgeResult if task["evaluation_type"] == "ide" else TextJudgeResult).model_validate(data)
+                for task, data in zip(tasks, items)
+            ]
+        except Exception as e:
+            logger.warning("Practical judge: batch of %d failed (%s), judging individually", len(chunk), e)
+            return await asyncio.gather(*(self._judge_single(item) for item in chunk))
+
+    async def _judge_single(self, item: dict):
+        question = item.get("question", "")
+        answer = item.get("answer", "")
+        score_max = item.get("score_max", 1000)
+        if item.get("evaluation_type", "text") == "ide":
+            return await self.judge_ide(question, answer, score_max)
+        return await self.judge_text(question, answer, score_max)
+
     def _format_code_for_llm(self, code: str) -> str:
         """
         Format code submission for LLM evaluation.
@@ -146,26 +395,15 @@ class PracticalJudge:
         # Remove leading/trailing whitespace
         code = code.strip()
         
-        lines = code.split('\n')
+        language = _detect_language(code)
         
-        # Detect language from file markers or code patterns
-        language = None
-        if '//' in code and ('function' in code or 'const' in code or 'let' in code):
-            language = 'javascript'
-        elif 'def ' in code or 'import ' in code or 'print(' in code:
-            language = 'python'
-        elif 'function' in code and '{' in code and '=>' in code:
-            language = 'typescript'
-        
-        # Check if it's multi-file (has // filename markers)
-        has_file_markers = any(
-            line.strip().startswith('//') and 
-            ('file' in line.lower() or any(ext in line.lower() for ext in ['.js', '.py', '.ts', '.java', '.cpp', '.c', '.go', '.rs', '.html', '.css']))
-            for line in lines[:10]
-        )
+        # Check if it's multi-file (has // filename markers) within the first 10 lines
+        has_file_markers = _FILE_MARKER_RE.search(code, 0, _nth_line_end(code, 10)) is not None
         
         if has_file_markers:
-            # Multi-file submission - format each file clearly with separators
+            # Multi-file submission - format each file clearly with separators.
+            # Only this path needs the code split into lines.
+            lines = code.split('\n')
             formatted_parts = []
             current_file = []
             current_filename = None
@@ -173,7 +411,7 @@ class PracticalJudge:
             for line in lines:
                 stripped = line.strip()
                 # Check if this is a file marker (// filename or // File: filename)
-                if stripped.startswith('//') and ('file' in stripped.lower() or any(ext in stripped.lower() for ext in ['.js', '.py', '.ts', '.java', '.cpp', '.c', '.go', '.rs', '.html', '.css'])):
+                if _FILE_MARKER_RE.match(stripped):
                     # Save previous file if exists
                     if current_filename and current_file:
                         file_code = '\n'.join(current_file).strip()
@@ -202,50 +440,31 @@ class PracticalJudge:
     async def judge_ide(self, question: dict, ide_code: str, score_max: int) -> IDEJudgeResult:
         # Use the dedicated technical_practical judge prompts
         try:
-            system = render_prompt("role/technical_practical/judge/system_prompt.jinja")
+            system = _PRACTICAL_SYSTEM
             # Extract question text - handle both {"question": "..."} and just string
             question_text = question.get("question", "") if isinstance(question, dict) else str(question)
             
             # Format code nicely for ChatGPT evaluation
             formatted_code = self._format_code_for_llm(ide_code)
             
-            # Log what we're sending to ChatGPT
-            print(f"[PRACTICAL_JUDGE] Sending to ChatGPT:")
-            print(f"  Question: {question_text[:200]}...")
-            print(f"  Code length: {len(formatted_code)} chars (original: {len(ide_code)} chars)")
-            print(f"  Code preview: {formatted_code[:300]}...")
+            # Log what we're sending to ChatGPT (formatted only when DEBUG is enabled)
+            logger.debug(
+                "Practical judge IDE: question=%.200s code_len=%d original_len=%d preview=%.300s",
+                question_text, len(formatted_code), len(ide_code), formatted_code,
+            )
             
-            prompt = render_prompt(
-                "role/technical_practical/judge/user_prompt.jinja",
+            prompt = _PRACTICAL_USER_TPL.render(
                 question=question_text,
                 user_code=formatted_code,  # Pass formatted code to ChatGPT
                 evaluation_type="ide",
                 score_max=score_max,
             )
             
-            print(f"[PRACTICAL_JUDGE] Calling OpenAI API...")
-            llm_resp = await self.client.generate_text(
-                LLMTextRequest(
-                    prompt=prompt,
-                    system=system,
-                    temperature=0.0,
-                    max_tokens=700,
-                )
+            return await _single_flight(
+                _cache_key(system, prompt), lambda: self._complete(IDEJudgeResult, system, prompt, "IDE")
             )
-            raw_text = llm_resp.text or ""
-            print(f"[PRACTICAL_JUDGE] ChatGPT response length: {len(raw_text)} chars")
-            print(f"[PRACTICAL_JUDGE] ChatGPT response preview: {raw_text[:300]}...")
-            
-            if not raw_text:
-                print("[PRACTICAL_JUDGE] ERROR: LLM returned empty response for IDE judging")
-                raise ValueError("Empty LLM response")
-            data = self._parse_llm_json(raw_text)
-            print(f"[PRACTICAL_JUDGE] Parsed JSON successfully: {data}")
-            return IDEJudgeResult(**data)
         except Exception as e:
-            print(f"[PRACTICAL_JUDGE] ERROR in judge_ide: {e}")
-            import traceback
-            traceback.print_exc()
+            logger.exception("Practical judge: judge_ide failed")
             # Return a default result instead of failing completely
             return IDEJudgeResult(
                 completeness=0,
@@ -257,46 +476,27 @@ class PracticalJudge:
     async def judge_text(self, question: dict, text_answer: str, score_max: int) -> TextJudgeResult:
         # Use the dedicated technical_practical judge prompts
         try:
-            system = render_prompt("role/technical_practical/judge/system_prompt.jinja")
+            system = _PRACTICAL_SYSTEM
             # Extract question text - handle both {"question": "..."} and just string
             question_text = question.get("question", "") if isinstance(question, dict) else str(question)
             
-            print(f"[PRACTICAL_JUDGE] Sending text answer to ChatGPT:")
-            print(f"  Question: {question_text[:200]}...")
-            print(f"  Text answer length: {len(text_answer)} chars")
-            print(f"  Text answer preview: {text_answer[:300]}...")
+            logger.debug(
+                "Practical judge text: question=%.200s answer_len=%d preview=%.300s",
+                question_text, len(text_answer), text_answer,
+            )
             
-            prompt = render_prompt(
-                "role/technical_practical/judge/user_prompt.jinja",
+            prompt = _PRACTICAL_USER_TPL.render(
                 question=question_text,
                 text_answer=text_answer,  # Pass text directly to ChatGPT
                 evaluation_type="text",
                 score_max=score_max,
             )
             
-            print(f"[PRACTICAL_JUDGE] Calling OpenAI API for text...")
-            llm_resp = await self.client.generate_text(
-                LLMTextRequest(
-                    prompt=prompt,
-                    system=system,
-                    temperature=0.0,
-                    max_tokens=700,
-                )
+            return await _single_flight(
+                _cache_key(system, prompt), lambda: self._complete(TextJudgeResult, system, prompt, "text")
             )
-            raw_text = llm_resp.text or ""
-            print(f"[PRACTICAL_JUDGE] ChatGPT text response length: {len(raw_text)} chars")
-            print(f"[PRACTICAL_JUDGE] ChatGPT text response preview: {raw_text[:300]}...")
-            
-            if not raw_text:
-                print("[PRACTICAL_JUDGE] ERROR: LLM returned empty response for text judging")
-                raise ValueError("Empty LLM response")
-            data = self._parse_llm_json(raw_text)
-            print(f"[PRACTICAL_JUDGE] Parsed text JSON successfully: {data}")
-            return TextJudgeResult(**data)
         except Exception as e:
-            print(f"[PRACTICAL_JUDGE] ERROR in judge_text: {e}")
-            import traceback
-            traceback.print_exc()
+            logger.exception("Practical judge: judge_text failed")
             # Return a default result instead of failing completely
             return TextJudgeResult(
                 completeness=0,
@@ -305,69 +505,27 @@ class PracticalJudge:
                 reasoning=f"Error judging text: {str(e)}"
             )
 
-    def _parse_llm_json(self, text: str) -> dict:
-        """Attempt to extract a JSON object from an LLM response with aggressive clean-up.
+    async def _complete(self, model, system: str, prompt: str, kind: str):
+        logger.debug("Practical judge: calling OpenAI for %s", kind)
+        async with _JUDGE_SEM:
+            llm_resp = await self.client.generate_text(
+                LLMTextRequest(
+                    prompt=prompt,
+                    system=system,
+                    temperature=0.0,
+                    max_tokens=700,
+                    response_format=_JSON_OBJECT,
+                )
+            )
+        raw_text = llm_resp.text or ""
+        logger.debug("Practical judge %s response: len=%d preview=%.300s", kind, len(raw_text), raw_text)
 
-        This mirrors the BehaviouralJudge parser so both judges behave consistently.
-        """
-        cleaned = text.strip()
-        # Remove markdown code fences if present
-        if cleaned.startswith("```"):
-            cleaned = re.sub(r"^```(?:json)?\\s*", "", cleaned, flags=re.IGNORECASE)
-            cleaned = re.sub(r"```$", "", cleaned.strip())
-        # Debug: always print the raw cleaned LLM output in full
-        print("[DEBUG] PracticalJudge raw LLM output:")
-        print(cleaned)
-        sys.stdout.flush()
-        # Quick json.loads attempt
-        try:
-            result = json.loads(cleaned)
-            if isinstance(result, dict):
-                return result
-            if isinstance(result, list) and result and isinstance(result[0], dict):
-                return result[0]
-        except Exception:
-            pass
-        # Regex: find first JSON object
-        match = re.search(r"{[\s\S]*}", cleaned)
-        if match:
-            candidate = match.group(0)
-            last_brace = candidate.rfind("}")
-            candidate = candidate[: last_brace + 1]
-            try:
-                result2 = json.loads(candidate)
-                if isinstance(result2, dict):
-                    return result2
-                if isinstance(result2, list) and result2 and isinstance(result2[0], dict):
-                    return result2[0]
-            except Exception:
-                pass
-        # Line by line brace-block fallback
-        lines = [l for l in cleaned.splitlines() if l.strip()]
-        json_lines = []
-        in_obj = False
-        brace_count = 0
-        for line in lines:
-            if not in_obj and "{" in line:
-                in_obj = True
-            if in_obj:
-                json_lines.append(line)
-                brace_count += line.count("{")
-                brace_count -= line.count("}")
-                if brace_count <= 0:
-                    break
-        if json_lines:
-            candidate2 = "\n".join(json_lines).strip()
-            try:
-                result3 = json.loads(candidate2)
-                if isinstance(result3, dict):
-                    return result3
-                if isinstance(result3, list) and result3 and isinstance(result3[0], dict):
-                    return result3[0]
-            except Exception:
-                pass
-        print("[DEBUG] PracticalJudge could not parse LLM output with any strategy!")
-        raise ValueError("Failed to parse JSON from LLM response after multiple strategies")
+        if not raw_text:
+            logger.warning("Practical judge: LLM returned empty response for %s judging", kind)
+            raise ValueError("Empty LLM response")
+        result = _validate_llm_json(model, raw_text)
+        logger.debug("Practical judge %s result: %s", kind, result)
+        return result
 
     def _calculate_total_score(self, results: dict) -> int:
         ide = results.get("ide")
@@ -389,22 +547,21 @@ class PracticalJudge:
         """
         ide = results.get("ide")
         text = results.get("text")
+        ide_reasoning = ide.reasoning if isinstance(ide, IDEJudgeResult) else ""
+        text_reasoning = text.reasoning if isinstance(text, TextJudgeResult) else ""
 
         # Start with a tone prefix based on total_score
         if total_score >= 2001:
-            prefix = "You absolutely crushed this practical round. "
+            prefix = _PREFIX_HIRE
         elif total_score >= 1001:
-            prefix = "You did okay overall in this practical round. "
+            prefix = _PREFIX_OK
         else:
-            prefix = "This practical round was rough for you. "
-
-        parts = []
-        if isinstance(ide, IDEJudgeResult) and ide.reasoning:
-            parts.append(f"For your code: {ide.reasoning}")
-        if isinstance(text, TextJudgeResult) and text.reasoning:
-            parts.append(f"For your written answer: {text.reasoning}")
+            prefix = _PREFIX_ROUGH
 
-        detail = " ".join(parts).strip()
-        if detail:
-            return prefix + detail
+        if ide_reasoning and text_reasoning:
+            return f"{prefix}For your code: {ide_reasoning} For your written answer: {text_reasoning}".rstrip()
+        if ide_reasoning:
+            return f"{prefix}For your code: {ide_reasoning}".rstrip()
+        if text_reasoning:
+            return f"{prefix}For your written answer: {text_reasoning}".rstrip()
         return prefix.strip()
\ No newline at end of file
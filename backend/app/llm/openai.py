@@ -1,19 +1,58 @@
+import asyncio
+import os
 import httpx
+
+try:
+    from orjson import dumps as _dumps, loads as _loads
+except ImportError:
+    import json
+    from json import loads as _loads
+
+    def _dumps(obj) -> bytes:
+        return json.dumps(obj).encode("utf-8")
 from .client import LLMTextRequest, LLMTextResponse, LLMUsage
 
 class OpenAIClient:
-    def __init__(self, api_key):
+    def __init__(self, api_key, keep_raw: bool = False):
         self._api_key = api_key
+        # Nothing reads LLMTextResponse.raw by default, so don't keep the whole envelope alive
+        self._keep_raw = keep_raw
         self._base_url = "https://api.openai.com/v1"
         self._model = "gpt-4o-mini"
         self._timeout_s = 30
+        self._http = None
 
-    async def generate_text(self, input: LLMTextRequest) -> LLMTextResponse:
-        url = f"{self._base_url}/chat/completions"
-        headers = {
-            "Authorization": f"Bearer {self._api_key}",
-            "Content-Type": "application/json",
-        }
+    def _get_http(self) -> httpx.AsyncClient:
+        # One pooled client per OpenAIClient keeps TCP/TLS connections alive between calls;
+        # base URL and auth header are set once here instead of per request (httpx adds
+        # Content-Type per body, which the multipart batch upload relies on)
+        if self._http is None:
+            self._http = httpx.AsyncClient(
+                base_url=self._base_url,
+                headers={"Authorization": f"Bearer {self._api_key}"},
+                timeout=self._timeout_s,
+                limits=httpx.Limits(max_keepalive_connections=100, max_connections=200),
+            )
+        return self._http
+
+    async def aclose(self) -> None:
+        """Close the pooled HTTP client; the next request opens a fresh one."""
+        if self._http is not None:
+            await self._http.aclose()
+            self._http = None
+
+    async def warm(self) -> None:
+        """Open a pooled connection to the API host ahead of the first real request.
+
+        Best effort: any response (or failure) is ignored, the point is only to
+        get the TCP/TLS handshake out of the way.
+        """
+        try:
+            await self._get_http().head("/models")
+        except httpx.HTTPError:
+            pass
+
+    def _chat_payload(self, input: LLMTextRequest) -> dict:
         messages = []
         if input.system:
             messages.append({"role": "system", "content": input.system})
@@ -24,15 +63,117 @@ class OpenAIClient:
             "temperature": input.temperature or 0.7,
             "max_tokens": input.max_tokens or 800,
         }
-        async with httpx.AsyncClient(timeout=self._timeout_s) as client:
-            response = await client.post(url, headers=headers, json=payload)
+        if input.response_format:
+            payload["response_format"] = input.response_format
+        return payload
+
+    async def generate_text(self, input: LLMTextRequest) -> LLMTextResponse:
+        if input.stream:
+            # Streamed completions don't report usage, so only the text comes back
+            text = "".join([chunk async for chunk in self.generate_text_stream(input)])
+            return LLMTextResponse.model_construct(text=text, usage=None, raw=None)
+        response = await self._get_http().post("/chat/completions", json=self._chat_payload(input))
+        response.raise_for_status()
+        # Decode the body bytes directly rather than via response.text
+        return self._text_response(_loads(response.content))
+
+    async def generate_text_stream(self, input: LLMTextRequest):
+        """Yield the completion text in chunks as the API streams it back."""
+        payload = self._chat_payload(input)
+        payload["stream"] = True
+        async with self._get_http().stream("POST", "/chat/completions", json=payload) as response:
             response.raise_for_status()
-            data = response.json()
+            async for line in response.aiter_lines():
+                if not line.startswith("data: "):
+                    continue
+                data = line[6:]
+                if data == "[DONE]":
+                    break
+                choices = _loads(data)["choices"]
+                if choices:
+                    content = choices[0]["delta"].get("content")
+                    if content:
+                        yield content
+
+    async def generate_batch(self, inputs: list, poll_interval_s: float = 30.0) -> list:
+        """
+        Run many chat completions through the OpenAI Batch API.
+
+        Batches cost half as much as individual calls but may take up to 24h,
+        so this is for offline jobs only. Responses come back in input order,
+        with None for any request that failed inside the batch; raises
+        RuntimeError only if the batch as a whole fails.
+        """
+        http = self._get_http()
+        jsonl = b"\n".join(
+            _dumps({
+                "custom_id": str(i),
+                "method": "POST",
+                "url": "/v1/chat/completions",
+                "body": self._chat_payload(request),
+            })
+            for i, request in enumerate(inputs)
+        )
+        upload = await http.post(
+            "/files",
+            data={"purpose": "batch"},
+            files={"file": ("batch.jsonl", jsonl, "application/jsonl")},
+        )
+        upload.raise_for_status()
+        created = await http.post(
+            "/batches",
+            json={
+                "input_file_id": _loads(upload.content)["id"],
+                "endpoint": "/v1/chat/completions",
+                "completion_window": "24h",
+            },
+        )
+        created.raise_for_status()
+        batch = _loads(created.content)
+
+        while batch["status"] not in ("completed", "failed", "expired", "cancelled"):
+            await asyncio.sleep(poll_interval_s)
+            polled = await http.get(f"/batches/{batch['id']}")
+            polled.raise_for_status()
+            batch = _loads(polled.content)
+        if batch["status"] != "completed":
+            raise RuntimeError(f"OpenAI batch {batch['id']} ended with status {batch['status']}")
+        if not batch.get("output_file_id"):
+            # Completed with no output file: every request in it failed
+            return [None] * len(inputs)
+
+        output = await http.get(f"/files/{batch['output_file_id']}/content")
+        output.raise_for_status()
+        results = {}
+        for line in output.content.splitlines():
+            if line.strip():
+                item = _loads(line)
+                response = item.get("response") or {}
+                if response.get("status_code") == 200:
+                    results[item["custom_id"]] = self._text_response(response["body"])
+        return [results.get(str(i)) for i in range(len(inputs))]
+
+    def _text_response(self, data: dict) -> LLMTextResponse:
         text = data["choices"][0]["message"]["content"]
         usage_data = data.get("usage") or {}
-        usage = LLMUsage(
+        # The envelope comes straight from the API, so skip re-validating its fields
+        usage = LLMUsage.model_construct(
             prompt_tokens=usage_data.get("prompt_tokens"),
             completion_tokens=usage_data.get("completion_tokens"),
             total_tokens=usage_data.get("total_tokens"),
         )
-        return LLMTextResponse(text=text, usage=usage, raw=data)
+        return LLMTextResponse.model_construct(text=text, usage=usage, raw=data if self._keep_raw else None)
+
+
+_default_client = None
+
+def get_openai_client() -> OpenAIClient:
+    """Return the process-wide OpenAIClient, creating it on first use.
+
+    Judges and generators share it so every LLM call reuses the same
+    connection pool instead of opening a fresh TLS connection.
+    """
+    global _default_client
+    if _default_client is None:
+        _default_client = OpenAIClient(api_key=os.environ.get("OPENAI_API_KEY"))
+    return _default_client
@@ -1,13 +1,38 @@
 import os
-from jinja2 import Environment, FileSystemLoader, select_autoescape
+from functools import lru_cache
+from jinja2 import Environment, FileSystemLoader, Template, select_autoescape
 
+_PROMPTS_DIR = os.path.dirname(__file__)
+
+# Templates ship with the code, so compile each one once and never re-stat it.
 _env = Environment(
-    loader=FileSystemLoader(os.path.dirname(__file__)),
+    loader=FileSystemLoader(_PROMPTS_DIR),
     autoescape=select_autoescape(enabled_extensions=("jinja",)),
+    auto_reload=False,
+    cache_size=-1,
 )
 
+def _prewarm() -> None:
+    """Compile every .jinja template up front so no request pays for a first parse."""
+    for dirpath, _dirnames, filenames in os.walk(_PROMPTS_DIR):
+        for filename in filenames:
+            if filename.endswith(".jinja"):
+                rel_path = os.path.relpath(os.path.join(dirpath, filename), _PROMPTS_DIR)
+                _env.get_template(rel_path.replace(os.sep, "/"))
+
+_prewarm()
+
+@lru_cache(maxsize=64)
+def _render_static(template_name: str) -> str:
+    return _env.get_template(template_name).render()
+
+def get_template(template_name: str) -> Template:
+    """Return the compiled template so hot callers can keep it and call ``render`` directly."""
+    return _env.get_template(template_name)
+
 def render(template_name: str, **context) -> str:
+    if not context:
+        # System prompts take no context, so their output is constant
+        return _render_static(template_name)
     template = _env.get_template(template_name)
     return template.render(**context)
-
-
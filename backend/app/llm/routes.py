@@ -1,9 +1,32 @@
+import asyncio
+import re
+from contextlib import aclosing
+from functools import lru_cache
 from fastapi import APIRouter
 from .client import LLMTextRequest
 from .schemas import RoleQuestionsRequest, RoleQuestionsResponse
 from .prompts.renderer import render as render_prompt
 import os
-import json
+
+try:
+    import orjson
+    from fastapi.responses import ORJSONResponse as _JSONResponse
+
+    def _loads(data: bytes):
+        return orjson.loads(data)
+
+    def _dumps(data) -> bytes:
+        return orjson.dumps(data, option=orjson.OPT_INDENT_2 | orjson.OPT_NON_STR_KEYS)
+except ImportError:
+    import json
+    # ORJSONResponse needs orjson at render time, so fall back to the stdlib-backed response
+    from fastapi.responses import JSONResponse as _JSONResponse
+
+    def _loads(data: bytes):
+        return json.loads(data)
+
+    def _dumps(data) -> bytes:
+        return json.dumps(data, indent=2, ensure_ascii=False).encode("utf-8")
 
 SCRIPT_DIR = os.path.dirname(os.path.abspath(__file__))
 OUTPUT_DIR = os.path.join(SCRIPT_DIR, "output")
@@ -12,133 +35,258 @@ OUTPUT_FILES = {
     "technical_theory": os.path.join(OUTPUT_DIR, "technical_theory.json"),
     "technical_practical": os.path.join(OUTPUT_DIR, "technical_practical.json"),
 }
+_FILE_LOCKS = {qtype: asyncio.Lock() for qtype in OUTPUT_FILES}
+# Caps concurrent question-generation calls so fan-out stays within the OpenAI rate limit
+_LLM_SEM = asyncio.Semaphore(int(os.getenv("LLM_MAX_CONCURRENCY", "4")))
+
+# (system, user) template paths per question type; behavioural keeps its prompts under question/
+_PROMPT_PATHS = {
+    qtype: (
+        (f"role/{qtype}/question/system_prompt.jinja", f"role/{qtype}/question/user_prompt.jinja")
+        if qtype == "behavioural"
+        else (f"role/{qtype}/system_prompt.jinja", f"role/{qtype}/user_prompt.jinja")
+    )
+    for qtype in OUTPUT_FILES
+}
+_SYSTEM_PROMPTS = {qtype: render_prompt(paths[0]) for qtype, paths in _PROMPT_PATHS.items()}
+
+@lru_cache(maxsize=256)
+def _user_prompt(qtype: str, role: str, max_questions: int) -> str:
+    return render_prompt(_PROMPT_PATHS[qtype][1], role=role, max_questions=max_questions)
+
+# Parsed question banks keyed by path, with the st_mtime_ns they were read at and the set of
+# question texts per (role, level) built from them. Only this process writes the banks, so
+# the file is re-parsed only if something else touched it.
+_CACHE: dict[str, tuple[int, dict, dict]] = {}
+
+def _theory_question_text(q):
+    # Banks are hand-editable: accept legacy plain-string entries, and give malformed
+    # entries a None key (never a generated question's text) instead of failing the request
+    if type(q) is dict:
+        return q.get("question")
+    return q if type(q) is str else None
+
+# Question text used for de-duplication; the other banks hold plain strings
+_QUESTION_TEXT = {qtype: str for qtype in OUTPUT_FILES}
+_QUESTION_TEXT["technical_theory"] = _theory_question_text
+
+def _load_bank(path: str) -> dict:
+    """Return the parsed bank at `path`; callers hold its _FILE_LOCKS entry."""
+    try:
+        mtime_ns = os.stat(path).st_mtime_ns
+    except FileNotFoundError:
+        return {}
+    cached = _CACHE.get(path)
+    if cached is not None and cached[0] == mtime_ns:
+        return cached[1]
+    with open(path, "rb") as f:
+        data = _loads(f.read())
+    _CACHE[path] = (mtime_ns, data, {})
+    return data
+
+def _existing_questions(path: str, data: dict, qtype: str, role: str, level: str) -> set:
+    """Question texts already in data[role][level], reused across requests while `data` is cached."""
+    cached = _CACHE.get(path)
+    index = cached[2] if cached is not None and cached[1] is data else {}
+    seen = index.get((role, level))
+    if seen is None:
+        seen = index[(role, level)] = set(map(_QUESTION_TEXT[qtype], data[role][level]))
+    return seen
+
+def _save_bank(path: str, data: dict) -> None:
+    """Write the question bank atomically so readers never see a half-written file."""
+    # Drop the entry first: `data` may be the cached dict already mutated, and a failed
+    # write must not leave it paired with the old file's mtime
+    previous = _CACHE.pop(path, None)
+    tmp_path = path + ".tmp"
+    with open(tmp_path, "wb") as f:
+        f.write(_dumps(data))
+    os.replace(tmp_path, path)
+    index = previous[2] if previous is not None and previous[1] is data else {}
+    _CACHE[path] = (os.stat(path).st_mtime_ns, data, index)
 
 def create_llm_router(client):
     router = APIRouter()
 
-    @router.post("/llm/questions", response_model=RoleQuestionsResponse)
+    # Handlers build the response dicts themselves and return them pre-serialized, so
+    # FastAPI skips jsonable_encoder and response_model re-validation; the models below
+    # only document the shape in OpenAPI.
+    @router.post("/llm/questions", responses={200: {"model": RoleQuestionsResponse}})
     async def post_questions(body: RoleQuestionsRequest):
-        level = body.level or "intern"
-        qtype_path = body.question_type
-        
-        # Handle different prompt paths
-        if qtype_path == "behavioural":
-            system_path = f"role/{qtype_path}/question/system_prompt.jinja"
-            prompt_path = f"role/{qtype_path}/question/user_prompt.jinja"
-        else:
-            system_path = f"role/{qtype_path}/system_prompt.jinja"
-            prompt_path = f"role/{qtype_path}/user_prompt.jinja"
-        
-        system = render_prompt(system_path)
-        prompt = render_prompt(prompt_path, role=body.role, max_questions=body.max_questions)
-        resp = await client.generate_text(
-            LLMTextRequest(
-                prompt=prompt,
-                system=system,
-                temperature=0.7,
-                max_tokens=1200 if body.question_type == "technical_theory" else 800,
+        return _JSONResponse(await _generate_questions(client, body))
+
+    @router.post("/llm/questions/all", responses={200: {"model": list[RoleQuestionsResponse]}})
+    async def post_all_questions(body: RoleQuestionsRequest):
+        """Generate every question type for the role/level concurrently (body.question_type is ignored)."""
+        requests = [
+            RoleQuestionsRequest(role=body.role, level=body.level, max_questions=body.max_questions, question_type=qtype)
+            for qtype in OUTPUT_FILES
+        ]
+        return _JSONResponse(await asyncio.gather(*(_generate_questions(client, req) for req in requests)))
+
+    return router
+
+async def _generate_questions(client, body: RoleQuestionsRequest) -> dict:
+    """Generate questions for one role/level/question_type and merge them into its output file."""
+    level = body.level or "intern"
+    system = _SYSTEM_PROMPTS[body.question_type]
+    prompt = _user_prompt(body.question_type, body.role, body.max_questions)
+    
+    # Parse questions differently for technical_theory vs others. Theory blocks are
+    # parsed as the completion streams in, and the stream is dropped once enough are in.
+    if body.question_type == "technical_theory":
+        request = LLMTextRequest(prompt=prompt, system=system, temperature=0.7, max_tokens=1200, stream=True)
+        async with _LLM_SEM:
+            questions = [
+                q async for q in _stream_technical_theory_questions(
+                    client.generate_text_stream(request), body.max_questions
+                )
+            ]
+    else:
+        async with _LLM_SEM:
+            resp = await client.generate_text(
+                LLMTextRequest(prompt=prompt, system=system, temperature=0.7, max_tokens=800)
             )
-        )
-        
-        # Parse questions differently for technical_theory vs others
-        if body.question_type == "technical_theory":
-            questions = _parse_technical_theory_questions(resp.text, body.max_questions)
-        else:
-            lines = [line.strip() for line in resp.text.splitlines() if line.strip()]
-            if len(lines) > body.max_questions:
-                lines = lines[:body.max_questions]
-            questions = lines
-        
-        # Save to file in nested format
-        outfile = OUTPUT_FILES[body.question_type]
-        data = {}
-        if os.path.exists(outfile):
-            with open(outfile, "r", encoding="utf-8") as f:
-                data = json.load(f)
-        role = body.role.lower()
+        lines = [line.strip() for line in resp.text.splitlines() if line.strip()]
+        if len(lines) > body.max_questions:
+            lines = lines[:body.max_questions]
+        questions = lines
+    
+    # Save to file in nested format. The read-modify-write is serialized per file so
+    # concurrent requests can't drop each other's questions, and the disk work runs
+    # in a thread so it doesn't stall the event loop.
+    outfile = OUTPUT_FILES[body.question_type]
+    role = body.role.lower()
+    async with _FILE_LOCKS[body.question_type]:
+        data = await asyncio.to_thread(_load_bank, outfile)
         if role not in data:
             data[role] = {}
         if level not in data[role]:
             data[role][level] = []
         
-        # For technical_theory, check by question text to avoid duplicates
-        existing_questions = {q.get("question", q) if isinstance(q, dict) else q for q in data[role][level]}
+        # Skip questions whose text is already in the bank
+        existing_questions = _existing_questions(outfile, data, body.question_type, role, level)
+        question_text = _QUESTION_TEXT[body.question_type]
         for q in questions:
-            q_text = q.get("question", q) if isinstance(q, dict) else q
+            q_text = question_text(q)
             if q_text not in existing_questions:
                 data[role][level].append(q)
                 existing_questions.add(q_text)
         
-        with open(outfile, "w", encoding="utf-8") as f:
-            json.dump(data, f, indent=2, ensure_ascii=False)
-        
-        return RoleQuestionsResponse(role=role, level=level, question_type=body.question_type, questions=questions)
+        await asyncio.to_thread(_save_bank, outfile, data)
+    
+    return {"role": role, "level": level, "question_type": body.question_type, "questions": questions}
 
-    return router
+# One match per line: a tagged "Q:/Difficulty:/Correct:/Incorrect:" line, or a blank line
+# (group 1 is None) that ends the current question block. Other lines are not matched.
+_THEORY_LINE_RE = re.compile(r"^[^\S\n]*(?:(Q|Difficulty|Correct|Incorrect):(.*)|)$", re.MULTILINE)
 
-def _parse_technical_theory_questions(text: str, max_questions: int):
-    """Parse technical theory questions with answers from LLM output."""
-    questions = []
-    lines = text.split('\n')
-    current_q = None
-    
-    for line in lines:
-        line = line.strip()
-        if not line:
-            if current_q and current_q.get("question"):
-                current_q.setdefault("difficulty", 50)
-                ordered_q = {
-                    "question": current_q.get("question", ""),
-                    "difficulty": current_q.get("difficulty", 50),
-                    "correct": current_q.get("correct", ""),
-                    "incorrect": current_q.get("incorrect", []),
-                }
-                questions.append(ordered_q)
-                current_q = None
-                if len(questions) >= max_questions:
-                    break
-            continue
-        
-        if line.startswith("Q:"):
-            if current_q and current_q.get("question"):
-                # Ensure a default difficulty if it wasn't parsed
-                current_q.setdefault("difficulty", 50)
-                ordered_q = {
-                    "question": current_q.get("question", ""),
-                    "difficulty": current_q.get("difficulty", 50),
-                    "correct": current_q.get("correct", ""),
-                    "incorrect": current_q.get("incorrect", []),
-                }
-                questions.append(ordered_q)
-                if len(questions) >= max_questions:
-                    break
-            current_q = {
-                "question": line[2:].strip(),
+def _finish_theory_question(current_q: dict) -> dict:
+    return {
+        "question": current_q["question"],
+        "difficulty": current_q.get("difficulty", 50),
+        "correct": current_q["correct"],
+        "incorrect": current_q["incorrect"],
+    }
+
+class _TheoryQuestionBuilder:
+    """Assembles question dicts from matched _THEORY_LINE_RE lines, one line at a time."""
+
+    __slots__ = ("current_q",)
+
+    def __init__(self):
+        self.current_q = None
+
+    def feed(self, tag, value):
+        """Consume one matched line; return the question it completes, if any."""
+        current_q = self.current_q
+        if tag is None:
+            if current_q and current_q["question"]:
+                self.current_q = None
+                return _finish_theory_question(current_q)
+            return None
+
+        value = value.strip()
+        if tag == "Q":
+            self.current_q = {
+                "question": value,
                 "correct": "",
                 "incorrect": [],
             }
-        elif line.startswith("Difficulty:") and current_q:
+            if current_q and current_q["question"]:
+                return _finish_theory_question(current_q)
+        elif current_q is None:
+            pass
+        elif tag == "Difficulty":
             # Parse integer difficulty from 1–100; fall back to 50 on error
-            diff_str = line.split(":", 1)[1].strip()
             try:
-                current_q["difficulty"] = int(diff_str)
+                current_q["difficulty"] = int(value)
             except ValueError:
                 current_q["difficulty"] = 50
-        elif line.startswith("Correct:") and current_q:
-            current_q["correct"] = line[8:].strip()
-        elif line.startswith("Incorrect:") and current_q:
-            current_q["incorrect"].append(line[10:].strip())
+        elif tag == "Correct":
+            current_q["correct"] = value
+        else:
+            current_q["incorrect"].append(value)
+        return None
+
+    def finish(self):
+        """Return the trailing question if the text ended mid-block."""
+        current_q, self.current_q = self.current_q, None
+        if current_q and current_q["question"]:
+            return _finish_theory_question(current_q)
+        return None
+
+def _parse_technical_theory_questions(text: str, max_questions: int):
+    """Parse technical theory questions with answers from LLM output."""
+    questions = []
+    builder = _TheoryQuestionBuilder()
+    
+    for match in _THEORY_LINE_RE.finditer(text):
+        question = builder.feed(match.group(1), match.group(2))
+        if question is not None:
+            questions.append(question)
+            if len(questions) >= max_questions:
+                return questions[:max_questions]
     
-    if current_q and current_q.get("question") and len(questions) < max_questions:
-        current_q.setdefault("difficulty", 50)
-        ordered_q = {
-            "question": current_q.get("question", ""),
-            "difficulty": current_q.get("difficulty", 50),
-            "correct": current_q.get("correct", ""),
-            "incorrect": current_q.get("incorrect", []),
-        }
-        questions.append(ordered_q)
+    question = builder.finish()
+    if question is not None:
+        questions.append(question)
     
     return questions[:max_questions]
 
+async def _stream_technical_theory_questions(chunks, max_questions: int):
+    """
+    Streaming counterpart of _parse_technical_theory_questions: yields each question as
+    soon as its block is complete, and stops reading `chunks` once max_questions are out.
+    """
+    if max_questions <= 0:
+        return
+    builder = _TheoryQuestionBuilder()
+    produced = 0
+    pending = ""
+    async with aclosing(chunks):
+        async for chunk in chunks:
+            *lines, pending = (pending + chunk).split("\n")
+            for line in lines:
+                match = _THEORY_LINE_RE.match(line)
+                if match is None:
+                    continue
+                question = builder.feed(match.group(1), match.group(2))
+                if question is not None:
+                    yield question
+                    produced += 1
+                    if produced >= max_questions:
+                        return
 
+    # The last line has no trailing newline
+    match = _THEORY_LINE_RE.match(pending)
+    if match is not None:
+        question = builder.feed(match.group(1), match.group(2))
+        if question is not None:
+            yield question
+            produced += 1
+            if produced >= max_questions:
+                return
+    question = builder.finish()
+    if question is not None:
+        yield question
@@ -1,5 +1,5 @@
 from pydantic import BaseModel, root_validator
-from typing import Dict, Optional
+from typing import Dict, Optional, Union
 
 
 class RoleQuestionsRequest(BaseModel):
@@ -19,19 +19,19 @@ class RoleQuestionsRequest(BaseModel):
             values["max_questions"] = 10
         return values
 
-class RoleQuestionsResponse(BaseModel):
-    role: str
-    level: Optional[str] = None
-    question_type: str
-    questions: list[str]
-
-
 class TechnicalTheoryQuestion(BaseModel):
     question: str
     difficulty: int
     correct: str
     incorrect: list[str]
 
+class RoleQuestionsResponse(BaseModel):
+    role: str
+    level: Optional[str] = None
+    question_type: str
+    # technical_theory questions carry their answers; the other types are plain strings
+    questions: list[Union[str, TechnicalTheoryQuestion]]
+
 class BehaviouralJudgeResult(BaseModel):
     """
     LLM judge output format for behavioral question evaluation.
@@ -3,7 +3,6 @@ import sys
 import asyncio
 import json
 import argparse
-from dotenv import load_dotenv
 
 
 def _setup_paths():
@@ -24,37 +23,36 @@ TECH_THEORY_PATH = os.path.join(OUTPUT_DIR, "technical_theory.json")
 
 
 # Now that sys.path is configured, import project modules
-from app.llm.openai import OpenAIClient  # type: ignore  # noqa: E402
+from app.llm import _env  # type: ignore  # noqa: E402,F401  (loads .env before the modules below read it)
+from app.llm.openai import get_openai_client  # type: ignore  # noqa: E402
 from app.llm.client import LLMTextRequest  # type: ignore  # noqa: E402
 from app.llm.prompts.renderer import render as render_prompt  # type: ignore  # noqa: E402
 from app.llm.routes import _parse_technical_theory_questions  # type: ignore  # noqa: E402
 
+# How many role/level pairs run_all_existing generates for at once
+MAX_CONCURRENT_GENERATIONS = 4
 
-async def run_single_theory_generation(
-    role: str = "software engineering",
-    level: str = "intern",
-) -> None:
-    """
-    Temporary helper to run the technical_theory LLM pipeline end-to-end
-    using the updated templates (with Difficulty: 1–100) and parser.
-
-    - Calls the technical_theory system/user prompts
-    - Lets the LLM generate question blocks with Difficulty
-    - Parses them into dicts with question/difficulty/correct/incorrect
-    - Prints them for review (no file writes).
-    """
-    load_dotenv(dotenv_path=os.path.join(SCRIPT_DIR, "..", "..", ".env"))
 
-    # Load existing data to determine how many more questions we need.
+def _load_theory_data() -> dict:
     if os.path.exists(TECH_THEORY_PATH):
         try:
             with open(TECH_THEORY_PATH, "r", encoding="utf-8") as f:
-                data = json.load(f)
+                return json.load(f)
         except Exception:
-            data = {}
-    else:
-        data = {}
+            return {}
+    return {}
+
+
+def _save_theory_data(data: dict) -> None:
+    with open(TECH_THEORY_PATH, "w", encoding="utf-8") as f:
+        json.dump(data, f, indent=2, ensure_ascii=False)
 
+
+def _prepare_top_up(data: dict, role: str, level: str):
+    """
+    Normalize `data[role][level]` and build the LLM request for the questions it
+    is missing. Returns (to_generate, request), or None if the pair is full.
+    """
     role_key = role
     level_key = level
 
@@ -64,38 +62,35 @@ async def run_single_theory_generation(
     if level_key not in data[role_key] or not isinstance(data[role_key][level_key], list):
         data[role_key][level_key] = []
 
-    existing_list = data[role_key][level_key]
-    existing_count = len(existing_list)
+    existing_count = len(data[role_key][level_key])
 
     # Target 10 questions per role/level, adding up to 7 at a time.
     missing = max(0, 10 - existing_count)
     if missing <= 0:
         print(f"Role='{role_key}', level='{level_key}' already has {existing_count} questions (>=10). Nothing to add.")
-        return
+        return None
 
     to_generate = min(7, missing)
 
-    load_dotenv(dotenv_path=os.path.join(SCRIPT_DIR, "..", "..", ".env"))
-
-    client = OpenAIClient(api_key=os.getenv("OPENAI_API_KEY"))
-
     system = render_prompt("role/technical_theory/system_prompt.jinja")
     prompt = render_prompt(
         "role/technical_theory/user_prompt.jinja",
         role=role,
         max_questions=to_generate,
     )
-
-    resp = await client.generate_text(
-        LLMTextRequest(
-            prompt=prompt,
-            system=system,
-            temperature=0.7,
-            max_tokens=1200,
-        )
+    request = LLMTextRequest(
+        prompt=prompt,
+        system=system,
+        temperature=0.7,
+        max_tokens=1200,
     )
+    return to_generate, request
 
-    questions = _parse_technical_theory_questions(resp.text or "", to_generate)
+
+def _merge_generated(data: dict, role: str, level: str, text: str, to_generate: int) -> None:
+    """Parse the LLM output for one role/level and append the new questions to `data`."""
+    existing_list = data[role][level]
+    questions = _parse_technical_theory_questions(text or "", to_generate)
 
     # Append new questions, avoiding duplicates by question text.
     existing_questions = {
@@ -110,22 +105,62 @@ async def run_single_theory_generation(
             existing_questions.add(q_text)
             added += 1
 
-    data[role_key][level_key] = existing_list
-
-    with open(TECH_THEORY_PATH, "w", encoding="utf-8") as f:
-        json.dump(data, f, indent=2, ensure_ascii=False)
-
     print(
         f"Generated and saved {added} technical theory questions with difficulty "
-        f"for role='{role_key}', level='{level_key}'. "
+        f"for role='{role}', level='{level}'. "
         f"Total now: {len(existing_list)} (target 10)."
     )
 
 
-async def run_all_existing() -> None:
+async def _top_up_role_level(client, data: dict, role: str, level: str, sem: asyncio.Semaphore) -> None:
+    """
+    Generate the questions missing for one role/level and merge them into `data`
+    in place. Only the LLM call awaits, so concurrent top-ups of different
+    role/level pairs can share one `data` dict safely.
+    """
+    job = _prepare_top_up(data, role, level)
+    if job is None:
+        return
+    to_generate, request = job
+
+    async with sem:
+        resp = await client.generate_text(request)
+
+    _merge_generated(data, role, level, resp.text, to_generate)
+
+
+async def run_single_theory_generation(
+    role: str = "software engineering",
+    level: str = "intern",
+) -> None:
+    """
+    Temporary helper to run the technical_theory LLM pipeline end-to-end
+    using the updated templates (with Difficulty: 1–100) and parser.
+
+    - Calls the technical_theory system/user prompts
+    - Lets the LLM generate question blocks with Difficulty
+    - Parses them into dicts with question/difficulty/correct/incorrect
+    - Tops the role/level up to 10 questions in technical_theory.json.
+    """
+    # Load existing data to determine how many more questions we need.
+    data = _load_theory_data()
+    client = get_openai_client()
+    try:
+        await _top_up_role_level(client, data, role, level, asyncio.Semaphore(1))
+    finally:
+        await client.aclose()
+    _save_theory_data(data)
+
+
+async def run_all_existing(use_batch: bool = False) -> None:
     """
     Iterate over all existing role/level combinations in technical_theory.json
     and top each up to 10 questions (adding up to 7 at a time).
+
+    The pairs are generated concurrently (at most MAX_CONCURRENT_GENERATIONS
+    LLM calls in flight) over one shared client, and the file is written once
+    at the end. With `use_batch`, all pairs go out as a single OpenAI Batch
+    job instead: half the cost, but results can take hours.
     """
     if not os.path.exists(TECH_THEORY_PATH):
         print(f"No existing file at {TECH_THEORY_PATH}; nothing to do.")
@@ -142,12 +177,54 @@ async def run_all_existing() -> None:
         print(f"Unexpected structure in {TECH_THEORY_PATH}; expected top-level dict.")
         return
 
-    for role_key, level_dict in data.items():
-        if not isinstance(level_dict, dict):
+    client = get_openai_client()
+    sem = asyncio.Semaphore(MAX_CONCURRENT_GENERATIONS)
+
+    pairs = [
+        (role_key, level_key)
+        for role_key, level_dict in data.items()
+        if isinstance(level_dict, dict)
+        for level_key in level_dict.keys()
+    ]
+
+    try:
+        if use_batch:
+            await _top_up_batch(client, data, pairs)
+        else:
+            tasks = []
+            for role_key, level_key in pairs:
+                print(f"\n[RUN] Filling role='{role_key}', level='{level_key}'...")
+                tasks.append(_top_up_role_level(client, data, role_key, level_key, sem))
+            # Let every pair settle before the client is closed and `data` is saved,
+            # so one failure neither cancels nor races the others
+            results = await asyncio.gather(*tasks, return_exceptions=True)
+            for (role_key, level_key), result in zip(pairs, results):
+                if isinstance(result, BaseException):
+                    print(f"[ERROR] role='{role_key}', level='{level_key}' failed: {result!r}")
+    finally:
+        await client.aclose()
+        # Keep whatever was generated even if one pair failed
+        _save_theory_data(data)
+
+
+async def _top_up_batch(client, data: dict, pairs: list) -> None:
+    """Top up every role/level pair through one OpenAI Batch job."""
+    jobs = []
+    for role_key, level_key in pairs:
+        job = _prepare_top_up(data, role_key, level_key)
+        if job is not None:
+            jobs.append((role_key, level_key, *job))
+    if not jobs:
+        return
+
+    print(f"\n[BATCH] Submitting {len(jobs)} role/level pairs as one batch...")
+    responses = await client.generate_batch([request for _, _, _, request in jobs])
+    for (role_key, level_key, to_generate, _), resp in zip(jobs, responses):
+        # Failed requests come back as None; keep the rest of the batch
+        if resp is None:
+            print(f"[ERROR] role='{role_key}', level='{level_key}' failed in the batch")
             continue
-        for level_key in level_dict.keys():
-            print(f"\n[RUN] Filling role='{role_key}', level='{level_key}'...")
-            await run_single_theory_generation(role=role_key, level=level_key)
+        _merge_generated(data, role_key, level_key, resp.text, to_generate)
 
 
 def _parse_args() -> argparse.Namespace:
@@ -177,13 +254,18 @@ def _parse_args() -> argparse.Namespace:
         action="store_true",
         help="If set, ignore role/level and fill all existing role/level combos to 10 questions.",
     )
+    parser.add_argument(
+        "--batch",
+        action="store_true",
+        help="With --all-existing, submit all generations as one OpenAI Batch job (cheaper, but slow).",
+    )
     return parser.parse_args()
 
 
 if __name__ == "__main__":
     args = _parse_args()
     if args.all_existing:
-        asyncio.run(run_all_existing())
+        asyncio.run(run_all_existing(use_batch=args.batch))
     else:
         asyncio.run(
             run_single_theory_generation(
@@ -1,11 +1,27 @@
 import sys
 import os
+import argparse
 import asyncio
 import json
 import random
 from datetime import datetime
-from dotenv import load_dotenv
-load_dotenv(dotenv_path=os.path.join(os.path.dirname(__file__), '..', '..', '.env'))
+from functools import lru_cache
+import httpx
+
+try:
+    import orjson
+
+    def _loads(data: bytes):
+        return orjson.loads(data)
+
+    def _dumps(data) -> bytes:
+        return orjson.dumps(data, option=orjson.OPT_INDENT_2 | orjson.OPT_NON_STR_KEYS)
+except ImportError:
+    def _loads(data: bytes):
+        return json.loads(data)
+
+    def _dumps(data) -> bytes:
+        return json.dumps(data, indent=2, ensure_ascii=False).encode("utf-8")
 
 SCRIPT_DIR = os.path.dirname(os.path.abspath(__file__))
 OUTPUT_DIR = os.path.join(SCRIPT_DIR, "output")
@@ -20,31 +36,71 @@ OUTPUT_FILES = {
 APP_DIR = os.path.abspath(os.path.join(SCRIPT_DIR, "..", ".."))
 if APP_DIR not in sys.path:
     sys.path.insert(0, APP_DIR)
-from app.llm.openai import OpenAIClient
+from app.llm import _env  # noqa: F401  (loads .env before the modules below read it)
+from app.llm.openai import get_openai_client
 from app.llm.client import LLMTextRequest
 from app.llm.prompts.renderer import render as render_prompt
+from app.llm.routes import _stream_technical_theory_questions
 from app.llm.judge import BehaviouralJudge, TheoreticalJudge, PracticalJudge
 from app.llm.schemas import BehaviouralJudgeResult, TheoreticalJudgeResult, IDEJudgeResult, TextJudgeResult
 
+# path -> (st_mtime_ns, parsed data, role lookup); a file is only re-parsed after it changes
+# on disk. Callers get the cached dicts themselves, so anything they mutate must be saved back.
+_FILE_CACHE = {}
+
+def _role_lookup(data):
+    """Map each role's normalized name (stripped, lowercased) to its key in `data`."""
+    return {k.strip().lower(): k for k in data}
+
+def _intern_questions(data):
+    """Intern plain-string questions so text repeated across roles/levels is stored once."""
+    intern = sys.intern
+    for buckets in data.values():
+        lists = buckets.values() if isinstance(buckets, dict) else (buckets,)
+        for questions in lists:
+            if isinstance(questions, list):
+                questions[:] = [intern(q) if type(q) is str else q for q in questions]
+
 def load_type_file(path):
-    if os.path.exists(path):
-        try:
-            with open(path, "r", encoding="utf-8") as f:
-                existing = json.load(f)
-        except Exception:
-            existing = {}
-        if not isinstance(existing, dict):
-            existing = {}
-    else:
+    """Return (data, role_lookup) for a question file; both are empty if it doesn't exist."""
+    try:
+        mtime_ns = os.stat(path).st_mtime_ns
+    except FileNotFoundError:
+        return {}, {}
+    cached = _FILE_CACHE.get(path)
+    if cached is not None and cached[0] == mtime_ns:
+        return cached[1], cached[2]
+    try:
+        with open(path, "rb") as f:
+            existing = _loads(f.read())
+    except (OSError, ValueError):
+        # Unreadable or not valid JSON (orjson and json decode errors are ValueErrors)
+        existing = {}
+    if not isinstance(existing, dict):
         existing = {}
     for k, v in list(existing.items()):
         if not isinstance(v, (list, dict)):
             existing[k] = []
-    return existing
+    _intern_questions(existing)
+    role_lookup = _role_lookup(existing)
+    _FILE_CACHE[path] = (mtime_ns, existing, role_lookup)
+    return existing, role_lookup
 
 def save_type_file(path, d):
-    with open(path, "w", encoding="utf-8") as f:
-        json.dump(d, f, indent=2, ensure_ascii=False)
+    """Write the question file atomically so a crash mid-save can't truncate it."""
+    _FILE_CACHE.pop(path, None)
+    tmp_path = path + ".tmp"
+    with open(tmp_path, "wb") as f:
+        f.write(_dumps(d))
+    os.replace(tmp_path, path)
+    _FILE_CACHE[path] = (os.stat(path).st_mtime_ns, d, _role_lookup(d))
+
+def _print_json(obj):
+    """Pretty-print `obj` straight to stdout's byte stream, skipping the intermediate str."""
+    sys.stdout.flush()
+    sys.stdout.buffer.write(_dumps(obj))
+    sys.stdout.buffer.write(b"\n")
+    sys.stdout.buffer.flush()
 
 def get_nested_question_list(data, role, level):
     if isinstance(data.get(role), dict):
@@ -54,150 +110,69 @@ def get_nested_question_list(data, role, level):
         return []
     return []
 
-def _parse_technical_theory_questions(text, max_questions):
-    """Parse technical theory questions with answers from LLM output."""
-    questions = []
-    lines = text.split('\n')
-    current_q = None
-    
-    for line in lines:
-        line = line.strip()
-        if not line:
-            if current_q and current_q.get("question"):
-                current_q.setdefault("difficulty", 50)
-                ordered_q = {
-                    "question": current_q.get("question", ""),
-                    "difficulty": current_q.get("difficulty", 50),
-                    "correct": current_q.get("correct", ""),
-                    "incorrect": current_q.get("incorrect", []),
-                }
-                questions.append(ordered_q)
-                current_q = None
-                if len(questions) >= max_questions:
-                    break
-            continue
-        
-        if line.startswith("Q:"):
-            if current_q and current_q.get("question"):
-                current_q.setdefault("difficulty", 50)
-                ordered_q = {
-                    "question": current_q.get("question", ""),
-                    "difficulty": current_q.get("difficulty", 50),
-                    "correct": current_q.get("correct", ""),
-                    "incorrect": current_q.get("incorrect", []),
-                }
-                questions.append(ordered_q)
-                if len(questions) >= max_questions:
-                    break
-            current_q = {"question": line[2:].strip(), "correct": "", "incorrect": []}
-        elif line.startswith("Difficulty:") and current_q:
-            diff_str = line.split(":", 1)[1].strip()
-            try:
-                current_q["difficulty"] = int(diff_str)
-            except ValueError:
-                current_q["difficulty"] = 50
-        elif line.startswith("Correct:") and current_q:
-            current_q["correct"] = line[8:].strip()
-        elif line.startswith("Incorrect:") and current_q:
-            current_q["incorrect"].append(line[10:].strip())
-    
-    if current_q and current_q.get("question") and len(questions) < max_questions:
-        current_q.setdefault("difficulty", 50)
-        ordered_q = {
-            "question": current_q.get("question", ""),
-            "difficulty": current_q.get("difficulty", 50),
-            "correct": current_q.get("correct", ""),
-            "incorrect": current_q.get("incorrect", []),
-        }
-        questions.append(ordered_q)
-    
-    return questions[:max_questions]
-
-async def run_generation():
-    allowed_types = ["behavioural", "technical_theory", "technical_practical"]
-    typeinp = input("Question type ([b]ehavioural, [t]echnical_theory, [p]ractical)? ").strip().lower()
-    if typeinp in ["b", "behavioural", ""]:
-        qtype = "behavioural"
-        qtype_path = "behavioural"
-    elif typeinp in ["t", "technical_theory", "theory"]:
-        qtype = "technical_theory"
-        qtype_path = "technical_theory"
-    elif typeinp in ["p", "practical", "technical_practical"]:
-        qtype = "technical_practical"
-        qtype_path = "technical_practical"
-    else:
-        print(f"Unknown type '{typeinp}', defaulting to behavioural.")
-        qtype = "behavioural"
-        qtype_path = "behavioural"
-    outfile = OUTPUT_FILES[qtype]
-    data = load_type_file(outfile)
-    
-    # Prompt for role group
-    role_lookup = {k.strip().lower(): k for k in data}
-    print("\nAvailable roles:", ", ".join(data.keys()) if data else "(none - will create new)")
-    while True:
-        role_input = input("Enter the role group (case/spacing insensitive): ").strip()
-        if not role_input:
-            print("Role group cannot be empty.")
-            continue
-        role_normalized = role_input.lower()
-        if role_normalized in role_lookup:
-            role = role_lookup[role_normalized]
-            break
-        else:
-            # Allow creating new role
-            create = input(f"Role '{role_input}' not found. Create new role? (y/n): ").strip().lower()
-            if create in ["y", "yes", ""]:
-                role = role_input  # Use original casing
-                break
-            else:
-                print("Please enter an existing role or choose 'y' to create a new one.")
-    
-    # Prompt for level (always use nested structure)
-    valid_levels = ["intern", "junior", "midlevel", "senior", "lead"]
-    level_lookup = {k.strip().lower(): k for k in valid_levels}
-    print(f"\nAvailable levels: {', '.join(valid_levels)}")
-    while True:
-        level_input = input("Enter the level (case/spacing insensitive): ").strip().lower()
-        if level_input in level_lookup:
-            level = level_lookup[level_input]
-            break
-        else:
-            print(f"Invalid level. Please choose from: {', '.join(valid_levels)}")
-    
-    num = input("How many questions? (Default 5): ").strip()
-    try:
-        max_questions = int(num)
-    except Exception:
-        max_questions = 5
-    
+# Picks scoring questions and shuffles answer options. Set LLM_SEED to a non-zero integer
+# to make those picks reproducible; unset (or 0) seeds from the OS.
+_rng = random.Random(int(os.getenv("LLM_SEED", "0")) or None)
+
+QUESTION_TYPES = ("behavioural", "technical_theory", "technical_practical")
+VALID_LEVELS = ["intern", "junior", "midlevel", "senior", "lead"]
+_LEVEL_LOOKUP = {level: level for level in VALID_LEVELS}
+
+def _is_transient(exc):
+    """Rate limits, server errors and connection/timeout failures are worth retrying."""
+    if isinstance(exc, httpx.HTTPStatusError):
+        return exc.response.status_code == 429 or exc.response.status_code >= 500
+    return isinstance(exc, httpx.TransportError)
+
+async def _with_retry(coro_factory, attempts=5):
+    """Await coro_factory(), retrying transient API failures with jittered exponential backoff."""
+    for attempt in range(attempts):
+        try:
+            return await coro_factory()
+        except Exception as exc:
+            if attempt == attempts - 1 or not _is_transient(exc):
+                raise
+            await asyncio.sleep(min(2 ** attempt + random.random(), 30))
+
+@lru_cache(maxsize=512)
+def _render_cached(path, role, max_questions):
+    return render_prompt(path, role=role, max_questions=max_questions)
+
+async def generate_one(client, qtype, role, level, max_questions):
+    """Ask the LLM for questions of one type/role/level; returns (qtype, role, level, questions) without touching disk."""
     # Handle different prompt paths
-    if qtype_path == "behavioural":
-        system_path = f"role/{qtype_path}/question/system_prompt.jinja"
-        prompt_path = f"role/{qtype_path}/question/user_prompt.jinja"
+    if qtype == "behavioural":
+        system_path = f"role/{qtype}/question/system_prompt.jinja"
+        prompt_path = f"role/{qtype}/question/user_prompt.jinja"
     else:
-        system_path = f"role/{qtype_path}/system_prompt.jinja"
-        prompt_path = f"role/{qtype_path}/user_prompt.jinja"
+        system_path = f"role/{qtype}/system_prompt.jinja"
+        prompt_path = f"role/{qtype}/user_prompt.jinja"
     
+    # System prompts take no context and are cached by the renderer itself
     system = render_prompt(system_path)
-    prompt = render_prompt(prompt_path, role=role, max_questions=max_questions)
-    client = OpenAIClient(api_key=os.getenv("OPENAI_API_KEY"))
-    resp = await client.generate_text(LLMTextRequest(
-        prompt=prompt,
-        system=system,
-        temperature=0.7,
-        max_tokens=1200 if qtype == "technical_theory" else 800,
-    ))
-    
-    # Parse questions differently for technical_theory vs others
+    prompt = _render_cached(prompt_path, role, max_questions)
+    # Parse questions differently for technical_theory vs others. Theory blocks are
+    # parsed as the completion streams in, and the stream stops once enough are in.
     if qtype == "technical_theory":
-        questions = _parse_technical_theory_questions(resp.text, max_questions)
+        request = LLMTextRequest(prompt=prompt, system=system, temperature=0.7, max_tokens=1200, stream=True)
+        questions = [
+            q async for q in _stream_technical_theory_questions(client.generate_text_stream(request), max_questions)
+        ]
     else:
+        resp = await client.generate_text(LLMTextRequest(
+            prompt=prompt,
+            system=system,
+            temperature=0.7,
+            max_tokens=800,
+        ))
         lines = [line.strip() for line in resp.text.splitlines() if line.strip()]
         if len(lines) > max_questions:
             lines = lines[:max_questions]
         questions = lines
-    
+    return qtype, role, level, questions
+
+def merge_questions(data, role, level, questions):
+    """Append new questions to data[role][level], skipping duplicates; returns the bucket."""
     # Ensure nested structure exists and add questions
     if role not in data or not isinstance(data[role], dict):
         data[role] = {}
@@ -212,18 +187,145 @@ async def run_generation():
         if q_text not in existing_questions:
             ex.append(q)
             existing_questions.add(q_text)
-    data[role][level] = ex
+    return ex
+
+async def run_generation(qtype=None, role=None, level=None, num=None):
+    """Generate questions for one type/role/level, prompting for whatever wasn't passed in."""
+    if qtype is None:
+        typeinp = input("Question type ([b]ehavioural, [t]echnical_theory, [p]ractical)? ").strip().lower()
+        if typeinp in ["b", "behavioural", ""]:
+            qtype = "behavioural"
+        elif typeinp in ["t", "technical_theory", "theory"]:
+            qtype = "technical_theory"
+        elif typeinp in ["p", "practical", "technical_practical"]:
+            qtype = "technical_practical"
+        else:
+            print(f"Unknown type '{typeinp}', defaulting to behavioural.")
+            qtype = "behavioural"
+    outfile = OUTPUT_FILES[qtype]
+    data, role_lookup = load_type_file(outfile)
+    
+    # Prompt for role group
+    if role:
+        # Match an existing role case-insensitively, else create it as given
+        role = role_lookup.get(role.strip().lower(), role.strip())
+    else:
+        print("\nAvailable roles:", ", ".join(data.keys()) if data else "(none - will create new)")
+        while True:
+            role_input = input("Enter the role group (case/spacing insensitive): ").strip()
+            if not role_input:
+                print("Role group cannot be empty.")
+                continue
+            role_normalized = role_input.lower()
+            if role_normalized in role_lookup:
+                role = role_lookup[role_normalized]
+                break
+            else:
+                # Allow creating new role
+                create = input(f"Role '{role_input}' not found. Create new role? (y/n): ").strip().lower()
+                if create in ["y", "yes", ""]:
+                    role = role_input  # Use original casing
+                    break
+                else:
+                    print("Please enter an existing role or choose 'y' to create a new one.")
+    
+    # Prompt for level (always use nested structure)
+    if level is None:
+        print(f"\nAvailable levels: {', '.join(VALID_LEVELS)}")
+        while True:
+            level_input = input("Enter the level (case/spacing insensitive): ").strip().lower()
+            if level_input in _LEVEL_LOOKUP:
+                level = _LEVEL_LOOKUP[level_input]
+                break
+            else:
+                print(f"Invalid level. Please choose from: {', '.join(VALID_LEVELS)}")
+    
+    if num is None:
+        num = input("How many questions? (Default 5): ").strip()
+    try:
+        max_questions = int(num)
+    except Exception:
+        max_questions = 5
+    
+    client = get_openai_client()
+    _, _, _, questions = await _with_retry(lambda: generate_one(client, qtype, role, level, max_questions))
+    ex = merge_questions(data, role, level, questions)
     
     save_type_file(outfile, data)
     print(f"\nLLM Output for {qtype} / role '{role}' / level '{level}':")
-    print(json.dumps({"role": role, "level": level, "questions": ex}, indent=2, ensure_ascii=False))
+    _print_json({"role": role, "level": level, "questions": ex})
     print(f"Saved/updated role entry (stored as '{role}' / '{level}') in {outfile}\n")
 
-async def run_behavioural_scoring():
-    print("\n[Behavioural LLM Judge: Score an answer]\n")
-    behavioural_data = load_type_file(OUTPUT_FILES["behavioural"])
-    role_lookup = {k.strip().lower(): k for k in behavioural_data}
-    print("Available roles:", ", ".join(behavioural_data.keys()))
+async def run_batch(batch_file):
+    """
+    Generate every entry of a batch spec concurrently and save each output file once.
+
+    The spec is a JSON list of {"qtype", "role", "level", "num"} objects ("num"
+    defaults to 5). At most LLM_CONCURRENCY (default 16) calls are in flight,
+    all over the shared client. Rate limits and transient errors are retried
+    with backoff; entries that still fail are reported and skipped.
+    """
+    with open(batch_file, "r", encoding="utf-8") as f:
+        spec = json.load(f)
+    if not isinstance(spec, list):
+        print(f"Batch spec must be a JSON list of entries: {batch_file}")
+        return
+    jobs = []
+    for entry in spec:
+        if not isinstance(entry, dict):
+            print(f"Skipping invalid batch entry: {entry}")
+            continue
+        qtype = entry.get("qtype", "behavioural")
+        level = str(entry.get("level", "")).strip().lower()
+        role = entry.get("role")
+        role = role.strip() if isinstance(role, str) else ""
+        try:
+            num = int(entry.get("num", 5))
+        except (TypeError, ValueError):
+            num = 0
+        if qtype not in QUESTION_TYPES or level not in VALID_LEVELS or not role or num <= 0:
+            print(f"Skipping invalid batch entry: {entry}")
+            continue
+        jobs.append((qtype, role, level, num))
+    if not jobs:
+        print("Nothing to generate.")
+        return
+
+    client = get_openai_client()
+    sem = asyncio.Semaphore(int(os.getenv("LLM_CONCURRENCY", "16")))
+
+    async def bounded(job):
+        async with sem:
+            return await _with_retry(lambda: generate_one(client, *job))
+
+    results = await asyncio.gather(*(bounded(job) for job in jobs), return_exceptions=True)
+
+    by_qtype = {}
+    for job, result in zip(jobs, results):
+        if isinstance(result, BaseException):
+            print(f"[ERROR] {job[0]} / role '{job[1]}' / level '{job[2]}': {result!r}")
+            continue
+        by_qtype.setdefault(result[0], []).append(result[1:])
+
+    # Load each output file once and merge every result for it
+    pending_saves = []
+    for qtype, entries in by_qtype.items():
+        outfile = OUTPUT_FILES[qtype]
+        data, role_lookup = load_type_file(outfile)
+        for role, level, questions in entries:
+            role = role_lookup.setdefault(role.lower(), role)
+            ex = merge_questions(data, role, level, questions)
+            print(f"{qtype} / role '{role}' / level '{level}': {len(questions)} generated, {len(ex)} stored")
+        pending_saves.append((outfile, data))
+
+    # The files are independent, so serialize and write them in parallel
+    await asyncio.gather(*(asyncio.to_thread(save_type_file, outfile, data) for outfile, data in pending_saves))
+    for outfile, _ in pending_saves:
+        print(f"Saved {outfile}")
+
+def _prompt_question_list(data, role_lookup):
+    """Ask for a role (and level, for nested files); returns (role, level, questions) or None if there are none."""
+    print("Available roles:", ", ".join(data.keys()))
     while True:
         role_input = input("Enter the role group (case/spacing insensitive): ").strip().lower()
         if role_input in role_lookup:
@@ -232,34 +334,43 @@ async def run_behavioural_scoring():
             break
         else:
             print(f"Input '{role_input}' did not match any available role.")
-            print("Available roles:", ", ".join(behavioural_data.keys()))
+            print("Available roles:", ", ".join(data.keys()))
     level = None
     question_list = None
-    if isinstance(behavioural_data[role], dict):
-        level_lookup = {k.strip().lower(): k for k in behavioural_data[role]}
+    if isinstance(data[role], dict):
+        level_lookup = {k.strip().lower(): k for k in data[role]}
         print(f"Levels for {role}: {', '.join(level_lookup.values())}")
         while True:
             level_input = input("Enter the level (case/spacing insensitive): ").strip().lower()
             if level_input in level_lookup:
                 level = level_lookup[level_input]
                 print(f"Matched level: '{level}' (raw key from file)")
-                question_list = get_nested_question_list(behavioural_data, role, level)
+                question_list = get_nested_question_list(data, role, level)
                 break
             else:
                 print(f"Input '{level_input}' did not match any level for role '{role}'.")
                 print("Available levels:", ", ".join(level_lookup.values()))
     else:
-        question_list = behavioural_data.get(role, [])
+        question_list = data.get(role, [])
     if not question_list:
         missing = f"role '{role}'"
         if level:
             missing += f" / level '{level}'"
         print(f"No questions found for {missing}. Please generate or add some first.")
+        return None
+    return role, level, question_list
+
+async def run_behavioural_scoring():
+    print("\n[Behavioural LLM Judge: Score an answer]\n")
+    behavioural_data, role_lookup = load_type_file(OUTPUT_FILES["behavioural"])
+    picked = _prompt_question_list(behavioural_data, role_lookup)
+    if picked is None:
         return
-    question = random.choice(question_list)
+    role, level, question_list = picked
+    question = _rng.choice(question_list)
     print(f"Random question for {role}{' / ' + level if level else ''}:\n>> {question}\n")
     answer = input("Enter the user's answer: ").strip()
-    client = OpenAIClient(api_key=os.getenv("OPENAI_API_KEY"))
+    client = get_openai_client()
     judge = BehaviouralJudge(client)
     try:
         result = await judge.judge(question, answer)
@@ -268,46 +379,16 @@ async def run_behavioural_scoring():
         print(e)
         return
     print("\nLLM Judge Result:")
-    print(json.dumps(result.dict(), indent=2, ensure_ascii=False))
+    _print_json(result.dict())
 
 async def run_theoretical_scoring():
     print("\n[Theoretical Judge: Score an answer]\n")
-    theory_data = load_type_file(OUTPUT_FILES["technical_theory"])
-    role_lookup = {k.strip().lower(): k for k in theory_data}
-    print("Available roles:", ", ".join(theory_data.keys()))
-    while True:
-        role_input = input("Enter the role group (case/spacing insensitive): ").strip().lower()
-        if role_input in role_lookup:
-            role = role_lookup[role_input]
-            print(f"Matched role group: '{role}' (raw key from file)")
-            break
-        else:
-            print(f"Input '{role_input}' did not match any available role.")
-            print("Available roles:", ", ".join(theory_data.keys()))
-    level = None
-    question_list = None
-    if isinstance(theory_data[role], dict):
-        level_lookup = {k.strip().lower(): k for k in theory_data[role]}
-        print(f"Levels for {role}: {', '.join(level_lookup.values())}")
-        while True:
-            level_input = input("Enter the level (case/spacing insensitive): ").strip().lower()
-            if level_input in level_lookup:
-                level = level_lookup[level_input]
-                print(f"Matched level: '{level}' (raw key from file)")
-                question_list = get_nested_question_list(theory_data, role, level)
-                break
-            else:
-                print(f"Input '{level_input}' did not match any level for role '{role}'.")
-                print("Available levels:", ", ".join(level_lookup.values()))
-    else:
-        question_list = theory_data.get(role, [])
-    if not question_list:
-        missing = f"role '{role}'"
-        if level:
-            missing += f" / level '{level}'"
-        print(f"No questions found for {missing}. Please generate or add some first.")
+    theory_data, role_lookup = load_type_file(OUTPUT_FILES["technical_theory"])
+    picked = _prompt_question_list(theory_data, role_lookup)
+    if picked is None:
         return
-    question_data = random.choice(question_list)
+    role, level, question_list = picked
+    question_data = _rng.choice(question_list)
     if not isinstance(question_data, dict) or "question" not in question_data:
         print("Invalid question format.")
         return
@@ -316,7 +397,7 @@ async def run_theoretical_scoring():
     if question_data.get("incorrect"):
         print("Options:")
         all_answers = [question_data["correct"]] + question_data["incorrect"]
-        random.shuffle(all_answers)
+        _rng.shuffle(all_answers)
         for i, ans in enumerate(all_answers, 1):
             print(f"  {i}. {ans}")
         print()
@@ -324,12 +405,11 @@ async def run_theoretical_scoring():
     judge = TheoreticalJudge()
     result = judge.judge(question_data, answer)
     print("\nJudge Result:")
-    print(json.dumps(result.dict(), indent=2, ensure_ascii=False))
+    _print_json(result.dict())
 
 async def run_practical_scoring():
     print("\n[Practical LLM Judge: Score a code and/or text answer]\n")
-    practical_data = load_type_file(OUTPUT_FILES["technical_practical"])
-    role_lookup = {k.strip().lower(): k for k in practical_data}
+    practical_data, role_lookup = load_type_file(OUTPUT_FILES["technical_practical"])
     print("Available roles:", ", ".join(practical_data.keys()))
     while True:
         role_input = input("Enter the role group (case/spacing insensitive): ").strip().lower()
@@ -340,29 +420,27 @@ async def run_practical_scoring():
             print(f"Input '{role_input}' did not match any available role.")
             print("Available roles:", ", ".join(practical_data.keys()))
     level = None
-    valid_levels = ["intern", "junior", "midlevel", "senior", "lead"]
-    level_lookup = {k.strip().lower(): k for k in valid_levels}
-    print(f"Levels for {role}: {', '.join(valid_levels)}")
+    print(f"Levels for {role}: {', '.join(VALID_LEVELS)}")
     while True:
         level_input = input("Enter the level (case/spacing insensitive): ").strip().lower()
-        if level_input in level_lookup:
-            level = level_lookup[level_input]
+        if level_input in _LEVEL_LOOKUP:
+            level = _LEVEL_LOOKUP[level_input]
             break
         else:
             print(f"Input '{level_input}' did not match any level for role '{role}'.")
-            print("Available levels:", ", ".join(valid_levels))
+            print("Available levels:", ", ".join(VALID_LEVELS))
     # Pick a random practical question
     qlist = practical_data.get(role, {}).get(level, [])
     if not qlist:
         print(f"No questions found for role '{role}' / level '{level}'.")
         return
-    question = random.choice(qlist)
+    question = _rng.choice(qlist)
     # If stored as dict, get 'question' field
     question_str = question["question"] if isinstance(question, dict) and "question" in question else str(question)
     print(f"\nPractical Question for {role} / {level}:\n>> {question_str}\n")
     ide_code = input("Paste the user's code submission (or leave blank to skip): ").strip()
     text_answer = input("Paste the user's text answer (or leave blank to skip): ").strip()
-    client = OpenAIClient(api_key=os.getenv("OPENAI_API_KEY"))
+    client = get_openai_client()
     judge = PracticalJudge(client)
     try:
         result = await judge.judge_submission(question_str, {"ide_file": ide_code, "text_answer": text_answer})
@@ -373,15 +451,56 @@ async def run_practical_scoring():
         return
     print("\nLLM Practical Judge Result:")
     # Convert result fields to dict if they're Pydantic models
-    print(json.dumps({k: (v.dict() if hasattr(v, 'dict') else v) for k, v in result.items()}, indent=2, ensure_ascii=False))
+    _print_json({k: (v.dict() if hasattr(v, 'dict') else v) for k, v in result.items()})
 
 async def main():
+    try:
+        await _run(_parse_args())
+    finally:
+        # Every mode shares one pooled client; close it before the loop goes away
+        await get_openai_client().aclose()
+
+def _parse_args():
+    parser = argparse.ArgumentParser(
+        description="LLM question generation/judging utility. Runs interactively unless flags are given."
+    )
+    parser.add_argument("--mode", choices=["g", "s", "t", "p"], help="g: generate, s/t/p: score behavioural/theoretical/practical.")
+    parser.add_argument("--qtype", choices=QUESTION_TYPES, help="Question type to generate.")
+    parser.add_argument("--role", help="Role group to generate for (matched case-insensitively, created if new).")
+    parser.add_argument("--level", type=str.lower, choices=VALID_LEVELS, help="Level to generate for.")
+    parser.add_argument("--num", type=int, help="How many questions to generate (default 5).")
+    parser.add_argument("--batch", "--batch-file", dest="batch", metavar="FILE", help="JSON list of {qtype, role, level, num} to generate concurrently.")
+    return parser.parse_args()
+
+async def _run(args):
+    if args.batch:
+        await run_batch(args.batch)
+        return
+    if args.mode == "g" or (args.mode is None and (args.qtype or args.role or args.level or args.num is not None)):
+        await run_generation(args.qtype, args.role, args.level, args.num)
+        return
+    if args.mode == "s":
+        await run_behavioural_scoring()
+        return
+    if args.mode == "t":
+        await run_theoretical_scoring()
+        return
+    if args.mode == "p":
+        await run_practical_scoring()
+        return
+
     print("--- LLM Question/Test Utility ---")
     print("g: Generate questions by type and role")
     print("s: Score (judge) a behavioral answer (random question by role)")
     print("t: Score (judge) a theoretical answer (random question by role)")
     print("p: Score (judge) a practical answer (code and/or text, random question)")
-    mode = input("Mode ([g]enerate, [s]core behavioural, [t]score theoretical, [p]score practical)? ").strip().lower()
+    # Warm up the API connection while the user picks a mode; input() runs in a thread
+    # so the event loop is free to do the handshake meanwhile
+    warm = asyncio.create_task(get_openai_client().warm())
+    mode = (await asyncio.to_thread(
+        input, "Mode ([g]enerate, [s]core behavioural, [t]score theoretical, [p]score practical)? "
+    )).strip().lower()
+    await warm
     if mode in ("g", "generate", ""):  # default
         await run_generation()
     elif mode in ("s", "score"):
@@ -3,13 +3,79 @@ Video processing utilities for behavioral answer evaluation.
 Converts base64 video data to text transcription for LLM judging.
 """
 
+import asyncio
 import base64
-import tempfile
+import functools
+import hashlib
+import io
 import os
-from pathlib import Path
+import time
+from collections import OrderedDict
 from typing import Optional
 from datetime import datetime
 
+def _decode_payload(data_uri: str, offset: int) -> io.BytesIO:
+    """Decode the base64 payload of a data URI, starting at `offset`, into an in-memory file."""
+    return io.BytesIO(base64.b64decode(data_uri[offset:]))
+
+# Successful transcripts keyed by a digest of the whole data URI, so a replayed or
+# resubmitted answer skips both the decode and the Whisper call (LRU + TTL)
+_TRANSCRIPT_CACHE_SIZE = 256
+_TRANSCRIPT_TTL_S = 3600
+_transcript_cache = OrderedDict()
+
+def _transcript_key(data_uri: str) -> bytes:
+    # Hash in slices so a large payload isn't copied whole by a single encode()
+    digest = hashlib.blake2b(digest_size=16)
+    for offset in range(0, len(data_uri), 1 << 20):
+        digest.update(data_uri[offset:offset + (1 << 20)].encode())
+    return digest.digest()
+
+def _cached_transcript(key: bytes) -> Optional[str]:
+    hit = _transcript_cache.get(key)
+    if hit is None:
+        return None
+    expires_at, text = hit
+    if expires_at <= time.monotonic():
+        del _transcript_cache[key]
+        return None
+    _transcript_cache.move_to_end(key)
+    return text
+
+def _store_transcript(key: bytes, text: str) -> None:
+    _transcript_cache[key] = (time.monotonic() + _TRANSCRIPT_TTL_S, text)
+    if len(_transcript_cache) > _TRANSCRIPT_CACHE_SIZE:
+        _transcript_cache.popitem(last=False)
+
+# File extension per video mime type; anything else is saved/uploaded as webm
+_VIDEO_EXTENSIONS = {
+    "video/webm": ".webm",
+    "video/mp4": ".mp4",
+    "video/ogg": ".ogg",
+}
+
+# Data URI prefix of a recorded video answer (e.g. "data:video/webm;base64,...")
+_VIDEO_PREFIX = "data:video/"
+
+@functools.lru_cache(maxsize=1)
+def _default_openai_client(api_key: str):
+    """Shared SDK client for the fallback Whisper path, so its connection pool is reused."""
+    from openai import OpenAI
+    return OpenAI(api_key=api_key)
+
+# Keeps background transcript dumps referenced until they finish
+_background_tasks = set()
+
+_TRANSCRIPTS_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "transcriptions")
+# Directories this process has already created, so repeat saves skip the mkdir
+_dir_ready: set[str] = set()
+
+def _ensure_dir(path: str) -> None:
+    if path in _dir_ready:
+        return
+    os.makedirs(path, exist_ok=True)
+    _dir_ready.add(path)
+
 class VideoProcessor:
     """
     Processes video answers by transcribing them to text.
@@ -35,14 +101,23 @@ class VideoProcessor:
         Returns:
             True if the answer appears to be base64 video data
         """
-        if not answer or not isinstance(answer, str):
-            return False
-        
-        # Check for data URI scheme (e.g., "data:video/webm;base64,...")
-        if answer.startswith("data:video/"):
-            return True
+        # Exact type check and a fixed-length slice compare: this runs as a filter
+        # over every answer, most of which are plain text
+        return type(answer) is str and answer[:11] == _VIDEO_PREFIX
+    
+    def _parse_header(self, data_uri: str) -> tuple[str, int]:
+        """
+        Read the mime type from a data URI header without touching the payload.
         
-        return False
+        Args:
+            data_uri: The data URI string (e.g., "data:video/webm;base64,...")
+            
+        Returns:
+            Tuple of (mime_type, offset of the base64 payload)
+        """
+        comma = data_uri.index(",", 5)
+        mime_type = data_uri[5:comma].split(";", 1)[0]
+        return mime_type, comma + 1
     
     def extract_base64_data(self, data_uri: str) -> tuple[bytes, str]:
         """
@@ -57,15 +132,11 @@ class VideoProcessor:
         if not data_uri.startswith("data:"):
             raise ValueError("Invalid data URI format")
         
-        # Split into metadata and data
         # Format: data:video/webm;base64,<base64_data>
-        header, data = data_uri.split(",", 1)
-        
-        # Extract mime type
-        mime_type = header.split(";")[0].replace("data:", "")
+        mime_type, offset = self._parse_header(data_uri)
         
         # Decode base64
-        video_bytes = base64.b64decode(data)
+        video_bytes = base64.b64decode(data_uri[offset:])
         
         return video_bytes, mime_type
     
@@ -83,96 +154,87 @@ class VideoProcessor:
             # Not video data, return as-is
             return answer
         
+        if not self.client:
+            # Fallback: return a placeholder
+            return "[Video answer - transcription not available]"
+        
         try:
-            # Extract video data
-            video_bytes, mime_type = self.extract_base64_data(answer)
+            # Hashing a multi-MB URI would stall the event loop, so it runs in a worker thread
+            cache_key = await asyncio.to_thread(_transcript_key, answer)
+            cached = _cached_transcript(cache_key)
+            if cached is not None:
+                return cached
             
-            # Determine file extension from mime type
-            extension_map = {
-                "video/webm": ".webm",
-                "video/mp4": ".mp4",
-                "video/ogg": ".ogg",
-            }
-            file_extension = extension_map.get(mime_type, ".webm")
+            # Extract mime type from the header: data:video/webm;base64,<base64_data>
+            mime_type, offset = self._parse_header(answer)
             
-            # Save to temporary file (Whisper API requires file input)
-            with tempfile.NamedTemporaryFile(
-                delete=False, 
-                suffix=file_extension,
-                mode='wb'
-            ) as tmp_file:
-                tmp_file.write(video_bytes)
-                tmp_file_path = tmp_file.name
+            # Determine file extension from mime type
+            file_extension = _VIDEO_EXTENSIONS.get(mime_type, ".webm")
             
-            try:
-                # Transcribe using OpenAI Whisper API
-                if self.client:
-                    transcription = await self._transcribe_with_openai(tmp_file_path)
-                else:
-                    # Fallback: return a placeholder
-                    transcription = "[Video answer - transcription not available]"
-                
-                return transcription
+            # Whisper only needs a named file-like object, so the video is decoded into
+            # memory (in a worker thread) and handed over without a temp file
+            buffer = await asyncio.to_thread(_decode_payload, answer, offset)
             
-            finally:
-                # Clean up temporary file
-                if os.path.exists(tmp_file_path):
-                    os.remove(tmp_file_path)
+            # Transcribe using OpenAI Whisper API
+            file_name = f"answer_{cache_key.hex()[:12]}{file_extension}"
+            return await self._transcribe_with_openai((file_name, buffer, mime_type), cache_key)
         
         except Exception as e:
             # Return error message as fallback
             return f"[Error transcribing video: {str(e)}]"
     
-    async def _transcribe_with_openai(self, audio_file_path: str) -> str:
+    async def transcribe_many(self, answers: list[str], max_concurrent: Optional[int] = None) -> list[str]:
+        """
+        Transcribe several answers concurrently, keeping input order.
+        
+        Args:
+            answers: Answers as accepted by transcribe_video (non-video answers pass through)
+            max_concurrent: Cap on Whisper calls in flight; defaults to the
+                WHISPER_MAX_CONCURRENT environment variable, else 5
+            
+        Returns:
+            One transcription (or error/placeholder text) per answer
+        """
+        if max_concurrent is None:
+            max_concurrent = int(os.getenv("WHISPER_MAX_CONCURRENT", "5"))
+        sem = asyncio.Semaphore(max_concurrent)
+        
+        async def one(answer: str) -> str:
+            async with sem:
+                return await self.transcribe_video(answer)
+        
+        # transcribe_video turns failures into error text, so nothing here raises
+        return await asyncio.gather(*(one(answer) for answer in answers))
+    
+    async def _transcribe_with_openai(self, audio_file: tuple, cache_key: Optional[bytes] = None) -> str:
         """
         Transcribe audio/video file using OpenAI Whisper API.
         
+        The SDK call is synchronous, so it runs in a worker thread to keep the
+        event loop serving other requests during the Whisper round-trip.
+        
         Args:
-            audio_file_path: Path to the audio/video file
+            audio_file: (file name, file-like object, mime type); the name's
+                extension tells Whisper the container format
+            cache_key: If given, a successful transcript is cached under this key
             
         Returns:
             Transcribed text
         """
         try:
-            text = ""
-            
-            # Method 1: If you have an OpenAI client instance
-            # Use the existing client to make the Whisper API call
-            if hasattr(self.client, 'client') and self.client.client:
-                # Assuming your OpenAI client wraps the official openai library
-                with open(audio_file_path, "rb") as audio_file:
-                    transcription = self.client.client.audio.transcriptions.create(
-                        model="whisper-1",
-                        file=audio_file,
-                        language="en",  # Optional: specify language for better accuracy
-                        response_format="text"  # Get plain text response
-                    )
-                    text = transcription if isinstance(transcription, str) else transcription.text
+            text = await asyncio.to_thread(self._sync_transcribe, audio_file)
+            if cache_key is not None:
+                _store_transcript(cache_key, text)
             
-            # Method 2: Direct OpenAI API call (fallback)
-            # If the above doesn't work, you can import OpenAI directly
-            else:
-                
-                # Initialize client with API key from environment
-                api_key = os.getenv("OPENAI_API_KEY")
-                if not api_key:
-                    raise ValueError("OPENAI_API_KEY not found in environment variables")
-                
-                # Use official OpenAI library
-                from openai import OpenAI
-                openai_client = OpenAI(api_key=api_key)
-                
-                with open(audio_file_path, "rb") as audio_file:
-                    transcription = openai_client.audio.transcriptions.create(
-                        model="whisper-1",
-                        file=audio_file,
-                        language="en",
-                        response_format="text"
-                    )
-                    text = transcription
-            
-            # Save transcription to file for debugging
-            self._save_transcription_to_file(text, audio_file_path)
+            # Opt-in debug dump (SAVE_TRANSCRIPTS=1), written in a worker thread after
+            # the caller already has its text
+            if os.getenv("SAVE_TRANSCRIPTS") == "1":
+                file_name, buffer, _ = audio_file
+                task = asyncio.get_running_loop().create_task(asyncio.to_thread(
+                    self._save_transcription_to_file, text, file_name, buffer.getbuffer().nbytes
+                ))
+                _background_tasks.add(task)
+                task.add_done_callback(_background_tasks.discard)
             
             return text
         
@@ -189,41 +251,68 @@ class VideoProcessor:
             else:
                 return f"[Error transcribing video: {error_msg}]"
     
-    def _save_transcription_to_file(self, text: str, audio_file_path: str):
+    def _sync_transcribe(self, audio_file: tuple) -> str:
+        """Blocking Whisper call; run it through asyncio.to_thread."""
+        # Method 1: If you have an OpenAI client instance
+        # Use the existing client to make the Whisper API call
+        if hasattr(self.client, 'client') and self.client.client:
+            # Assuming your OpenAI client wraps the official openai library
+            transcription = self.client.client.audio.transcriptions.create(
+                model="whisper-1",
+                file=audio_file,
+                language="en",  # Optional: specify language for better accuracy
+                response_format="text"  # Get plain text response
+            )
+            return transcription if isinstance(transcription, str) else transcription.text
+        
+        # Method 2: Direct OpenAI API call (fallback)
+        # If the above doesn't work, you can import OpenAI directly
+        
+        # Initialize client with API key from environment
+        api_key = os.getenv("OPENAI_API_KEY")
+        if not api_key:
+            raise ValueError("OPENAI_API_KEY not found in environment variables")
+        
+        # Use official OpenAI library (one client per key, kept across calls)
+        openai_client = _default_openai_client(api_key)
+        
+        return openai_client.audio.transcriptions.create(
+            model="whisper-1",
+            file=audio_file,
+            language="en",
+            response_format="text"
+        )
+    
+    def _save_transcription_to_file(self, text: str, source_name: str, size_bytes: int):
         """
         Save transcription to a text file for debugging purposes.
+        Only called when SAVE_TRANSCRIPTS=1.
         
         Args:
             text: The transcribed text
-            audio_file_path: Path to the original audio file (for naming)
+            source_name: Name the video was uploaded under (for naming)
+            size_bytes: Size of the decoded video
         """
         try:
             # Create output directory if it doesn't exist
-            script_dir = os.path.dirname(os.path.abspath(__file__))
-            output_dir = os.path.join(script_dir, "transcriptions")
-            Path(output_dir).mkdir(parents=True, exist_ok=True)
+            _ensure_dir(_TRANSCRIPTS_DIR)
             
             # Generate filename with timestamp
             timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-            base_name = os.path.splitext(os.path.basename(audio_file_path))[0]
-            output_file = os.path.join(output_dir, f"transcription_{timestamp}_{base_name}.txt")
+            base_name = os.path.splitext(source_name)[0]
+            output_file = os.path.join(_TRANSCRIPTS_DIR, f"transcription_{timestamp}_{base_name}.txt")
             
-            # Write transcription to file
+            # Write transcription to file in one go
+            bar = "=" * 80
+            body = (
+                f"{bar}\nVIDEO TRANSCRIPTION - {timestamp}\n{bar}\n\n"
+                f"Source file: {source_name}\nFile size: {size_bytes} bytes\n"
+                f"Transcribed at: {datetime.now().isoformat()}\n\n{bar}\nTRANSCRIBED TEXT:\n{bar}\n\n"
+                f"{text}\n\n{bar}\nCharacter count: {len(text)}\n"
+                f"Word count: {len(text.split())}\n{bar}\n"
+            )
             with open(output_file, 'w', encoding='utf-8') as f:
-                f.write("="*80 + "\n")
-                f.write(f"VIDEO TRANSCRIPTION - {timestamp}\n")
-                f.write("="*80 + "\n\n")
-                f.write(f"Source file: {audio_file_path}\n")
-                f.write(f"File size: {os.path.getsize(audio_file_path)} bytes\n")
-                f.write(f"Transcribed at: {datetime.now().isoformat()}\n")
-                f.write("\n" + "="*80 + "\n")
-                f.write("TRANSCRIBED TEXT:\n")
-                f.write("="*80 + "\n\n")
-                f.write(text)
-                f.write("\n\n" + "="*80 + "\n")
-                f.write(f"Character count: {len(text)}\n")
-                f.write(f"Word count: {len(text.split())}\n")
-                f.write("="*80 + "\n")
+                f.write(body)
             
         except Exception as e:
             pass
@@ -244,18 +333,17 @@ class VideoProcessor:
             return None
         
         try:
-            video_bytes, mime_type = self.extract_base64_data(answer)
+            # Read the header first; the payload is only decoded once the
+            # destination is known to be usable
+            mime_type, offset = self._parse_header(answer)
             
             # Determine file extension
-            extension_map = {
-                "video/webm": ".webm",
-                "video/mp4": ".mp4",
-                "video/ogg": ".ogg",
-            }
-            file_extension = extension_map.get(mime_type, ".webm")
+            file_extension = _VIDEO_EXTENSIONS.get(mime_type, ".webm")
             
             # Create output directory if it doesn't exist
-            Path(output_dir).mkdir(parents=True, exist_ok=True)
+            _ensure_dir(output_dir)
+            
+            video_bytes = base64.b64decode(answer[offset:])
             
             # Save file
             output_path = os.path.join(output_dir, f"{filename}{file_extension}")
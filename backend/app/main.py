@@ -1,3 +1,4 @@
+from contextlib import asynccontextmanager
 from fastapi import FastAPI
 import os
 from dotenv import load_dotenv
@@ -5,15 +6,29 @@ from dotenv import load_dotenv
 from .llm.routes import create_llm_router
 from .llm.openai import OpenAIClient
 
+try:
+	import orjson  # noqa: F401  (ORJSONResponse only needs it importable)
+	from fastapi.responses import ORJSONResponse as _DefaultResponse
+except ImportError:
+	from fastapi.responses import JSONResponse as _DefaultResponse
+
 
 def create_app() -> FastAPI:
 	load_dotenv()  # load variables from a local .env if present
-	app = FastAPI(title="LLM Backend (Python)")
 
 	# Stub client; methods raise NotImplementedError until implemented
 	client = OpenAIClient(
 		api_key=os.environ.get("OPENAI_API_KEY"),
 	)
+
+	@asynccontextmanager
+	async def lifespan(app: FastAPI):
+		yield
+		# Release the pooled OpenAI connections on shutdown
+		await client.aclose()
+
+	# orjson (when installed) serializes responses without going through the stdlib json encoder
+	app = FastAPI(title="LLM Backend (Python)", lifespan=lifespan, default_response_class=_DefaultResponse)
 	app.include_router(create_llm_router(client), prefix="/api")
 
 	return app
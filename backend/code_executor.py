@@ -3,14 +3,88 @@ Code execution service for Python, Java, and JavaScript
 Executes code locally (Python/Java) or in browser (JavaScript)
 """
 import asyncio
+import hashlib
 import tempfile
 import os
 import sys
 import re
 import shutil
+import time
 from typing import Dict
 from datetime import datetime
 
+# Patterns for the class name javac expects the file to be named after
+_PUBLIC_CLASS_RE = re.compile(r'public\s+class\s+(\w+)')
+_CLASS_RE = re.compile(r'class\s+(\w+)')
+# Snippets are short-lived, so skip the optimizing JIT tier and the parallel GC setup;
+# both mostly add JVM startup time here. javac takes them prefixed with -J.
+_JVM_FAST_START_FLAGS = ('-XX:TieredStopAtLevel=1', '-XX:+UseSerialGC')
+_JAVAC_FAST_START_FLAGS = tuple(f'-J{flag}' for flag in _JVM_FAST_START_FLAGS)
+# Compiled classes keyed by a hash of the source, so re-running unchanged code skips javac.
+# The cache lives in a private (0700) directory next to this module, and runs only ever
+# get a copy of an entry, never a classpath into the cache itself. Each entry is a
+# directory whose mtime is bumped on use; the oldest go past the cap.
+_JAVA_CLASS_CACHE_DIR = os.getenv(
+    'JAVA_CLASS_CACHE_DIR', os.path.join(os.path.dirname(os.path.abspath(__file__)), '.java_class_cache')
+)
+_JAVA_CLASS_CACHE_MAX_ENTRIES = 500
+# Entries used this recently are never evicted, so a run copying one out is not cut short
+_JAVA_CLASS_CACHE_MIN_AGE_S = 60
+
+
+def _ensure_java_class_cache_dir() -> None:
+    os.makedirs(_JAVA_CLASS_CACHE_DIR, mode=0o700, exist_ok=True)
+    # makedirs leaves an existing directory's mode alone
+    os.chmod(_JAVA_CLASS_CACHE_DIR, 0o700)
+
+
+def _restore_java_classes(cached_dir: str, class_dir: str, class_name: str) -> bool:
+    """Copy a cached entry into the run's own class dir; False if there is no usable entry."""
+    if not os.path.isfile(os.path.join(cached_dir, f'{class_name}.class')):
+        return False
+    try:
+        shutil.copytree(cached_dir, class_dir)
+        os.utime(cached_dir)
+    except OSError:
+        # Evicted or unreadable mid-copy: compile as if it had never been cached
+        shutil.rmtree(class_dir, ignore_errors=True)
+        return False
+    return True
+
+
+def _publish_java_classes(class_dir: str, cached_dir: str) -> None:
+    """Copy freshly compiled classes into the cache (before anything runs from them)."""
+    try:
+        _ensure_java_class_cache_dir()
+        staging_dir = tempfile.mkdtemp(dir=_JAVA_CLASS_CACHE_DIR)
+    except OSError:
+        return
+    try:
+        shutil.copytree(class_dir, staging_dir, dirs_exist_ok=True)
+        # A single rename, so no run sees a partial entry; fails if another run got there first
+        os.rename(staging_dir, cached_dir)
+    except OSError:
+        shutil.rmtree(staging_dir, ignore_errors=True)
+        return
+    _evict_java_class_cache()
+
+
+def _evict_java_class_cache() -> None:
+    """Drop the least recently used compiled-class entries beyond the cache cap."""
+    try:
+        entries = [entry for entry in os.scandir(_JAVA_CLASS_CACHE_DIR) if entry.is_dir()]
+    except OSError:
+        return
+    excess = len(entries) - _JAVA_CLASS_CACHE_MAX_ENTRIES
+    if excess <= 0:
+        return
+    entries.sort(key=lambda entry: entry.stat().st_mtime)
+    cutoff = time.time() - _JAVA_CLASS_CACHE_MIN_AGE_S
+    for entry in entries[:excess]:
+        if entry.stat().st_mtime > cutoff:
+            break
+        shutil.rmtree(entry.path, ignore_errors=True)
+
 
 async def execute_code(language: str, code: str) -> Dict[str, any]:
     """
@@ -78,38 +152,45 @@ async def execute_code(language: str, code: str) -> Dict[str, any]:
     elif language == 'java':
         start_time = datetime.now()
         # Extract class name from code
-        public_match = re.search(r'public\s+class\s+(\w+)', code)
-        class_match = re.search(r'class\s+(\w+)', code)
-        class_name = public_match.group(1) if public_match else (class_match.group(1) if class_match else 'Main')
+        class_match = _PUBLIC_CLASS_RE.search(code) or _CLASS_RE.search(code)
+        class_name = class_match.group(1) if class_match else 'Main'
         
+        cache_key = hashlib.blake2b(code.encode('utf-8'), digest_size=16).hexdigest()
+        cached_dir = os.path.join(_JAVA_CLASS_CACHE_DIR, cache_key)
+        # Every run is isolated in its own temp dir; cached classes are copied in, not shared
         temp_dir = tempfile.mkdtemp()
         java_path = os.path.join(temp_dir, f'{class_name}.java')
+        class_dir = os.path.join(temp_dir, 'classes')
         
         try:
-            with open(java_path, 'w', encoding='utf-8') as f:
-                f.write(code)
-            
-            # Compile
-            compile_process = await asyncio.create_subprocess_exec(
-                'javac', java_path,
-                stdout=asyncio.subprocess.PIPE,
-                stderr=asyncio.subprocess.PIPE,
-                cwd=temp_dir
-            )
-            _, compile_stderr = await asyncio.wait_for(compile_process.communicate(), timeout=10)
-            
-            if compile_process.returncode != 0:
-                return {
-                    'stdout': '',
-                    'stderr': compile_stderr.decode('utf-8', errors='replace'),
-                    'exit_code': compile_process.returncode,
-                    'error': 'Java compilation failed',
-                    'execution_time': (datetime.now() - start_time).total_seconds()
-                }
+            if not await asyncio.to_thread(_restore_java_classes, cached_dir, class_dir, class_name):
+                with open(java_path, 'w', encoding='utf-8') as f:
+                    f.write(code)
+                
+                # Compile
+                compile_process = await asyncio.create_subprocess_exec(
+                    'javac', *_JAVAC_FAST_START_FLAGS, '-d', class_dir, java_path,
+                    stdout=asyncio.subprocess.PIPE,
+                    stderr=asyncio.subprocess.PIPE,
+                    cwd=temp_dir
+                )
+                _, compile_stderr = await asyncio.wait_for(compile_process.communicate(), timeout=10)
+                
+                if compile_process.returncode != 0:
+                    return {
+                        'stdout': '',
+                        'stderr': compile_stderr.decode('utf-8', errors='replace'),
+                        'exit_code': compile_process.returncode,
+                        'error': 'Java compilation failed',
+                        'execution_time': (datetime.now() - start_time).total_seconds()
+                    }
+                
+                # Cache a copy now, while the classes are still exactly what javac produced
+                await asyncio.to_thread(_publish_java_classes, class_dir, cached_dir)
             
             # Run
             run_process = await asyncio.create_subprocess_exec(
-                'java', '-cp', temp_dir, class_name,
+                'java', *_JVM_FAST_START_FLAGS, '-cp', class_dir, class_name,
                 stdout=asyncio.subprocess.PIPE,
                 stderr=asyncio.subprocess.PIPE,
                 cwd=temp_dir
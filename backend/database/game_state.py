@@ -821,12 +821,9 @@ async def calculate_and_store_scores(match_id: str, phase: str, player_ids: List
     if answer_phase == "behavioural":
         from game.behavioural_scoring import score_behavioural_answers
         from app.llm.judge import BehaviouralJudge
-        from app.llm.openai import OpenAIClient
-        import os
         
-        # Initialize judge
-        llm_client = OpenAIClient(api_key=os.environ.get("OPENAI_API_KEY"))
-        judge = BehaviouralJudge(llm_client)
+        # Initialize judge (shares the process-wide LLM client)
+        judge = BehaviouralJudge()
         
         # Calculate scores using LLM judge for each player (NO DATABASE LOCK HELD HERE)
         for player_id in player_ids:
@@ -8,8 +8,6 @@ from typing import Dict, Optional
 from datetime import datetime
 from database import SessionLocal, OngoingMatch
 from app.llm.judge import PracticalJudge
-from app.llm.openai import OpenAIClient
-import os
 
 
 async def score_technical_practical_submission(
@@ -151,8 +149,7 @@ async def score_technical_practical_submission(
         }
         
         # Initialize judge and score
-        llm_client = OpenAIClient(api_key=os.environ.get("OPENAI_API_KEY"))
-        judge = PracticalJudge(llm_client)
+        judge = PracticalJudge()
         
         print(f"[TECHNICAL_PRACTICAL_SCORING] Judging submission for player {player_id}...")
         print(f"[TECHNICAL_PRACTICAL_SCORING] IDE code present: {bool(ide_code)}, Text answer present: {bool(text_answer)}")
@@ -7,6 +7,7 @@ import os
 from router import router
 from database.router import db_router
 from database import init_db
+from app.llm.openai import get_openai_client
 
 app = FastAPI()
 
@@ -16,6 +17,11 @@ async def startup_event():
     init_db()
     print("Database initialized", flush=True)
 
+# Close the shared OpenAI connection pool on shutdown
+@app.on_event("shutdown")
+async def shutdown_event():
+    await get_openai_client().aclose()
+
 # CORS for React frontend
 cors_origins = os.environ.get("CORS_ORIGINS", "http://localhost:3000,http://localhost:5173,https://codejam25-production.up.railway.app").split(",")
 # In development, allow all origins
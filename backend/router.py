@@ -46,14 +46,14 @@ except ImportError as import_error:
             'execution_time': 0
         }
 from game.question_manager import question_manager
-from app.llm.openai import OpenAIClient
+from app.llm.openai import get_openai_client
 from app.llm.client import LLMTextRequest
 from app.llm.followup_generator import FollowUpQuestionGenerator
 from app.llm.prompts.renderer import render as render_prompt
 from app.llm.routes import _parse_technical_theory_questions
 
 # Initialize LLM client and generators
-llm_client = OpenAIClient(api_key=os.environ.get("OPENAI_API_KEY"))
+llm_client = get_openai_client()
 followup_generator = FollowUpQuestionGenerator(llm_client)
 
 router = APIRouter()